@@ -1,6 +1,9 @@
 from flask import Flask
 import os
 
+from app.core.json_provider import OrjsonProvider, orjson
+from app.core.config_store import ConfigStore
+
 def create_app(config=None):
     app = Flask(
         __name__,
@@ -15,12 +18,16 @@ def create_app(config=None):
         JSON_AS_ASCII=False 
     )
     
+    # Parseo/serialización JSON en C si orjson está disponible
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    
     # Aplicar configuración personalizada si se proporciona
     if config:
         app.config.update(config)
     
-    # Variable global para archivos de configuración
-    app.config['CONFIG_FILES_CONTENT'] = {}
+    # Archivos de configuración generados, por sesión (LRU acotado en memoria)
+    app.config['CONFIG_STORE'] = ConfigStore(app.config.get('CONFIG_STORE_SIZE', 32))
     
     # Registrar blueprints
     from app.routes import bp as main_bp
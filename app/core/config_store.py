@@ -0,0 +1,66 @@
+"""
+MÓDULO: config_store.py
+DESCRIPCIÓN: Almacén en memoria de los archivos de configuración generados
+AUTOR: Sistema de Diseño de Topologías
+FECHA: 2025
+
+Cada generación de topología guarda sus archivos (routers, switches,
+completo, ptbuilder, wlan) bajo una clave aleatoria que se entrega al
+navegador en la sesión. Así las descargas de un usuario no ven los
+archivos que generó otro usuario después, y el almacén está acotado:
+al superar max_entries se descarta la generación usada hace más tiempo.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+
+
+class ConfigStore:
+    """
+    Almacén LRU acotado de archivos generados, seguro entre hilos
+
+    Cada entrada es un diccionario con:
+        - files: {tipo: contenido str} tal como lo devuelve la generación
+        - downloads: caché de bytes/ETag/gzip por tipo (la llena routes.py)
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, files):
+        """
+        Guarda los archivos de una generación y devuelve su clave
+
+        Args:
+            files (dict): Contenido de cada archivo por tipo
+
+        Returns:
+            str: Clave aleatoria de la generación
+        """
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._entries[key] = {'files': files, 'downloads': {}}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return key
+
+    def get(self, key):
+        """
+        Devuelve la entrada de una generación (o None si no existe o expiró)
+
+        Args:
+            key (str | None): Clave devuelta por put()
+        """
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
@@ -0,0 +1,44 @@
+"""
+MÓDULO: json_provider.py
+DESCRIPCIÓN: Proveedor JSON de Flask respaldado por orjson
+AUTOR: Sistema de Diseño de Topologías
+FECHA: 2025
+
+orjson es un parser/serializador implementado en C. Para topologías grandes
+el parseo con el módulo json estándar (Python puro) domina el tiempo de la
+petición; orjson lo reduce varias veces y mantiene el GIL menos tiempo.
+
+orjson es opcional: si no está instalado, create_app() conserva el
+proveedor por defecto de Flask.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es una dependencia opcional
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON que delega en orjson (request.get_json, jsonify, app.json)
+
+    Mantiene la interfaz de DefaultJSONProvider: respeta sort_keys e indent
+    y usa el mismo default() para tipos no soportados de forma nativa.
+    """
+
+    def dumps(self, obj, **kwargs):
+        # OPT_PASSTHROUGH_DATETIME: las fechas pasan por default() y se
+        # serializan como fecha HTTP, igual que el proveedor de Flask
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        default = kwargs.get('default', self.default)
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # orjson acepta str, bytes o bytearray directamente
+        return orjson.loads(s)
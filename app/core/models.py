@@ -12,11 +12,14 @@ import ipaddress
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Combo:
     """
     Estructura de datos para representar un bloque de red asignado
     
+    Inmutable y con __slots__: las instancias no llevan __dict__, lo que
+    reduce su tamaño cuando se crean muchas por topología.
+    
     Atributos:
         net (IPv4Network): Red IP asignada (ej: 192.168.1.0/24)
         name (str): Nombre descriptivo (ej: "Backbone R1-R2")
@@ -1,3 +1,5 @@
+from app.logic.network_calculations.subnetting import first_last_host
+
 
 def generate_router_config(router_name: str, vlans: list, backbone_interfaces: list = None, vlan_interface_name: str = "eth", vlan_interface_number: str = "0/2/0") -> list[str]:
     """
@@ -92,11 +94,7 @@ def generate_router_config(router_name: str, vlans: list, backbone_interfaces: l
         int_number = vlan.get('interface_number', vlan_interface_number)
         
         # Obtener gateway (última IP utilizable) y network ID
-        hosts = list(network.hosts())
-        if hosts:
-            gateway = hosts[-1]  # Última IP utilizable como gateway
-        else:
-            gateway = network.network_address
+        _, gateway = first_last_host(network)  # Última IP utilizable como gateway
         
         netmask = network.netmask
         
@@ -114,11 +112,7 @@ def generate_router_config(router_name: str, vlans: list, backbone_interfaces: l
         vlan_name = vlan['name']
         network = vlan['network']
         
-        hosts = list(network.hosts())
-        if hosts:
-            gateway = hosts[-1]
-        else:
-            gateway = network.network_address
+        _, gateway = first_last_host(network)
         
         network_id = network.network_address
         netmask = network.netmask
@@ -1,3 +1,5 @@
+from app.logic.network_calculations.subnetting import first_last_host
+
 
 def generate_switch_core_config(switch_name: str, vlans: list, backbone_interfaces: list = None, trunk_interface_type: str = "fa", trunk_interface_number: str = "0/3") -> list[str]:
     """
@@ -108,11 +110,7 @@ def generate_switch_core_config(switch_name: str, vlans: list, backbone_interfac
         network = vlan['network']
         
         # Obtener gateway (última IP utilizable)
-        hosts = list(network.hosts())
-        if hosts:
-            gateway = hosts[-1]
-        else:
-            gateway = network.network_address
+        _, gateway = first_last_host(network)
         
         netmask = network.netmask
         
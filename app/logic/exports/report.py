@@ -5,6 +5,7 @@ DESCRIPCIÓN: Generación de reportes de configuración en formato texto
 
 import ipaddress
 from app.core.models import Combo
+from app.logic.network_calculations.subnetting import first_last_host
 
 
 def export_report_with_routers(combos: list[Combo], router_configs: list, out_path: str):
@@ -60,8 +61,7 @@ def export_report_with_routers(combos: list[Combo], router_configs: list, out_pa
                 vlan_name = vlan['name']
                 
                 # Obtener gateway (última IP utilizable)
-                hosts = list(network.hosts())
-                gateway = hosts[-1] if hosts else network.network_address
+                _, gateway = first_last_host(network)
                 
                 # Escribir nombre de VLAN con máscara
                 f.write(f"\n{vlan_name} - Máscara: {network.netmask}\n")
@@ -3,6 +3,12 @@ MÓDULO: text_files.py
 DESCRIPCIÓN: Generador de archivos TXT de configuración por tipo de dispositivo
 """
 
+from app.logic.network_calculations.subnetting import first_last_host
+
+# Separadores de sección (constantes de módulo: se construyen una sola vez)
+_SEP = "=" * 80
+_WLAN_SEP = "=" * 40
+
 
 def generate_separated_txt_files(router_configs):
     """
@@ -37,24 +43,31 @@ def generate_separated_txt_files(router_configs):
     Nota: Los archivos NO se guardan en disco, solo se generan en memoria
           para ser descargados directamente por el navegador.
     """
-    routers = [r for r in router_configs if r['type'] == 'router']
-    switch_cores = [r for r in router_configs if r['type'] == 'switch_core']
-    switches = [r for r in router_configs if r['type'] == 'switch']
+    # Una sola pasada: agrupar por tipo y unir cada configuración una única vez.
+    # El mismo texto se reutiliza en el archivo por tipo y en el completo.
+    by_type = {'router': [], 'switch_core': [], 'switch': []}
+    for device in router_configs:
+        group = by_type.get(device['type'])
+        if group is not None:
+            group.append((device['name'], _join_config(device['config'])))
+    routers = by_type['router']
+    switch_cores = by_type['switch_core']
+    switches = by_type['switch']
     
     files_content = {}
     
     # Contenido de archivo de routers
     content = []
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("CONFIGURACIONES DE ROUTERS")
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("")
     
-    for router in routers:
-        content.append("=" * 80)
-        content.append(f"ROUTER: {router['name']}")
-        content.append("=" * 80)
-        content.extend(router['config'])
+    for device_name, config_text in routers:
+        content.append(_SEP)
+        content.append(f"ROUTER: {device_name}")
+        content.append(_SEP)
+        content.extend(config_text)
         content.append("")
         content.append("")
     
@@ -62,16 +75,16 @@ def generate_separated_txt_files(router_configs):
     
     # Contenido de archivo de switch cores
     content = []
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("CONFIGURACIONES DE SWITCH CORES")
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("")
     
-    for swc in switch_cores:
-        content.append("=" * 80)
-        content.append(f"SWITCH CORE: {swc['name']}")
-        content.append("=" * 80)
-        content.extend(swc['config'])
+    for device_name, config_text in switch_cores:
+        content.append(_SEP)
+        content.append(f"SWITCH CORE: {device_name}")
+        content.append(_SEP)
+        content.extend(config_text)
         content.append("")
         content.append("")
     
@@ -79,16 +92,16 @@ def generate_separated_txt_files(router_configs):
     
     # Contenido de archivo de switches
     content = []
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("CONFIGURACIONES DE SWITCHES")
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("")
     
-    for switch in switches:
-        content.append("=" * 80)
-        content.append(f"SWITCH: {switch['name']}")
-        content.append("=" * 80)
-        content.extend(switch['config'])
+    for device_name, config_text in switches:
+        content.append(_SEP)
+        content.append(f"SWITCH: {device_name}")
+        content.append(_SEP)
+        content.extend(config_text)
         content.append("")
         content.append("")
     
@@ -102,33 +115,28 @@ def generate_separated_txt_files(router_configs):
     for device in router_configs:
         if 'vlans' in device:
             # Encabezado del bloque del dispositivo
-            wlan_content.append("=" * 40)
+            wlan_content.append(_WLAN_SEP)
             wlan_content.append(f"BLOQUE: {device['name']}")
-            wlan_content.append("=" * 40)
+            wlan_content.append(_WLAN_SEP)
             wlan_content.append("")
             
             # Parte 1: Configuración WLC (solo si hay VLAN nativa en este dispositivo)
             wlc_counter = 1
             for vlan in device['vlans']:
                 if vlan.get('is_native'):
-                    network = vlan['network']
-                    hosts = list(network.hosts())
-                    # IP Address: una antes del gateway (gateway es hosts[-1])
-                    wlan_ip = hosts[-2] if len(hosts) >= 2 else hosts[0]
+                    # IP Address: una antes del gateway (gateway es la última utilizable)
+                    _, wlan_ip = _usable_range(vlan['network'])
                     
                     wlan_content.append(f"WLC{wlc_counter}") # Usar contador de WLC, no ID de VLAN
                     wlan_content.append(f"Ip Address: {wlan_ip}")
-                    wlan_content.append(f"Subnet MASK: {network.netmask}")
+                    wlan_content.append(f"Subnet MASK: {vlan['mask']}")
                     wlan_content.append(f"Default Gateway: {vlan['gateway']}")
                     wlan_content.append("")
                     wlc_counter += 1
 
             # Parte 2: Resumen de todas las VLANs de este dispositivo
             for vlan in device['vlans']:
-                network = vlan['network']
-                hosts = list(network.hosts())
-                first_ip = hosts[0] if hosts else "N/A"
-                last_ip = hosts[-2] if len(hosts) > 1 else hosts[0]
+                first_ip, last_ip = _usable_range(vlan['network'])
                 
                 wlan_content.append(f"---{vlan['name']}---")
                 wlan_content.append("Rango usable:")
@@ -137,7 +145,7 @@ def generate_separated_txt_files(router_configs):
                 wlan_content.append("|")
                 wlan_content.append(f"|{last_ip}")
                 wlan_content.append(f"Gateway{vlan['gateway']}")
-                wlan_content.append(f"Máscara: {network.netmask}")
+                wlan_content.append(f"Máscara: {vlan['mask']}")
                 wlan_content.append("")
             
             wlan_content.append("") # Espacio entre bloques de dispositivos
@@ -146,47 +154,78 @@ def generate_separated_txt_files(router_configs):
 
     # Contenido de archivo completo (todos juntos)
     content = []
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("CONFIGURACIÓN COMPLETA DE LA TOPOLOGÍA")
-    content.append("=" * 80)
+    content.append(_SEP)
     content.append("")
     
     if routers:
         content.append("")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("ROUTERS")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("")
-        for router in routers:
-            content.append(f"--- {router['name']} ---")
-            content.extend(router['config'])
+        for device_name, config_text in routers:
+            content.append(f"--- {device_name} ---")
+            content.extend(config_text)
             content.append("")
             content.append("")
     
     if switch_cores:
         content.append("")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("SWITCH CORES")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("")
-        for swc in switch_cores:
-            content.append(f"--- {swc['name']} ---")
-            content.extend(swc['config'])
+        for device_name, config_text in switch_cores:
+            content.append(f"--- {device_name} ---")
+            content.extend(config_text)
             content.append("")
             content.append("")
     
     if switches:
         content.append("")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("SWITCHES")
-        content.append("=" * 80)
+        content.append(_SEP)
         content.append("")
-        for switch in switches:
-            content.append(f"--- {switch['name']} ---")
-            content.extend(switch['config'])
+        for device_name, config_text in switches:
+            content.append(f"--- {device_name} ---")
+            content.extend(config_text)
             content.append("")
             content.append("")
     
     files_content['completo'] = "\n".join(content)
     
     return files_content
+
+
+def _join_config(config_lines):
+    """
+    Une las líneas de una configuración en un solo bloque de texto
+    
+    Devuelve una lista de 0 o 1 elementos para usarla con list.extend():
+    "\n".join() sobre el resultado es idéntico a extender con las líneas
+    originales, incluida una configuración vacía.
+    """
+    return ["\n".join(config_lines)] if config_lines else []
+
+
+def _usable_range(network):
+    """
+    Primera IP utilizable y la anterior al gateway, sin materializar hosts()
+    
+    Equivale a (hosts[0], hosts[-2]) con hosts = list(network.hosts()),
+    o (hosts[0], hosts[0]) si la red tiene un solo host; para una /16 evita
+    crear 65534 objetos IPv4Address por VLAN.
+    
+    Args:
+        network (IPv4Network): Red de la VLAN
+    
+    Returns:
+        tuple: (IPv4Address primera, IPv4Address anterior al gateway)
+    """
+    first, last = first_last_host(network)
+    if network.prefixlen <= 31:
+        return first, last - 1
+    return first, first
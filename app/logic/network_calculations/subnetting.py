@@ -4,85 +4,214 @@ DESCRIPCIÓN: Algoritmos de subnetting y asignación de redes IP
 """
 
 import ipaddress
+from bisect import bisect_left, bisect_right
+
+# Máscara en notación decimal por longitud de prefijo (/0 a /32): solo hay
+# 33 posibles, así que se formatean una vez al importar el módulo
+_NETMASKS = tuple(str(ipaddress.IPv4Network((0, prefix)).netmask) for prefix in range(33))
+
+
+def netmask_str(prefix):
+    """
+    Máscara de red en notación decimal para una longitud de prefijo
+    
+    Equivale a str(net.netmask) sin formatear la dirección en cada llamada.
+    
+    Args:
+        prefix (int): Longitud de prefijo (0-32)
+    
+    Returns:
+        str: Máscara decimal (ej: 30 → '255.255.255.252')
+    
+    Ejemplo:
+        >>> netmask_str(24)
+        '255.255.255.0'
+    """
+    return _NETMASKS[prefix]
+
+
+class UsedRanges:
+    """
+    Conjunto ordenado de rangos de direcciones IPv4 ya asignados
+    
+    Guarda cada red como un par de enteros (inicio, fin) en dos listas
+    ordenadas y fusiona los rangos que se tocan o se solapan. Así la
+    consulta de solapamiento es una búsqueda binaria O(log n) en lugar de
+    comparar contra cada IPv4Network usada.
+    
+    Ejemplo:
+        >>> used = UsedRanges([ipaddress.ip_network('19.0.0.4/30')])
+        >>> start = int(ipaddress.ip_address('19.0.0.6'))
+        >>> str(ipaddress.ip_address(used.find_overlap(start, start + 3)))
+        '19.0.0.7'
+    """
+    
+    def __init__(self, networks=()):
+        self._starts = []
+        self._ends = []
+        for net in networks:
+            self.add(net)
+    
+    def __len__(self):
+        return len(self._starts)
+    
+    def add(self, net):
+        """Registra una red (IPv4Network) como usada"""
+        self.add_range(int(net.network_address), int(net.broadcast_address))
+    
+    def add_range(self, start, end):
+        """Registra el rango entero [start, end] fusionándolo con sus vecinos"""
+        starts, ends = self._starts, self._ends
+        # Primer rango que podría tocar a [start, end] (fin >= start - 1)
+        lo = bisect_left(ends, start - 1)
+        hi = lo
+        while hi < len(starts) and starts[hi] <= end + 1:
+            start = min(start, starts[hi])
+            end = max(end, ends[hi])
+            hi += 1
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+    
+    def find_overlap(self, start, end):
+        """
+        Busca un rango usado que se solape con [start, end]
+        
+        Returns:
+            int | None: Fin del rango que se solapa, o None si está libre
+        """
+        idx = bisect_right(self._starts, end) - 1
+        if idx >= 0 and self._ends[idx] >= start:
+            return self._ends[idx]
+        return None
 
 
 def generate_blocks(base_net, prefix, count, used, skip_first=False):
     """
     Genera bloques consecutivos de subredes sin conflictos
     
-    Optimización O(count) en lugar de O(2^n):
-        - Usa iterador en lugar de lista completa
-        - Set para búsquedas O(1) de redes usadas
-        - Early termination cuando alcanza 'count'
+    Optimización O(count · log n) en lugar de O(2^n):
+        - Recorre candidatos como enteros alineados al tamaño del bloque
+        - Cuando un candidato choca con un rango usado salta directamente
+          al primer bloque alineado después de ese rango
+        - Solo construye IPv4Network para los bloques elegidos
     
     Args:
         base_net (IPv4Network): Red base a subdividir (ej: 19.0.0.0/8)
         prefix (int): Tamaño de subredes a generar (ej: 30 para /30)
         count (int): Cantidad de subredes necesarias
-        used (list): Lista de redes ya asignadas (se modifica)
+        used (UsedRanges): Rangos ya asignados (se modifica)
         skip_first (bool): Si True, salta la primera subred (para evitar network ID)
     
     Returns:
         list: Lista de IPv4Network generadas
     
     Ejemplo:
-        >>> base = IPv4Network('192.168.0.0/16')
-        >>> used = []
+        >>> base = ipaddress.ip_network('192.168.0.0/16')
+        >>> used = UsedRanges()
         >>> subnets = generate_blocks(base, 24, 3, used)
         >>> [str(s) for s in subnets]
         ['192.168.0.0/24', '192.168.1.0/24', '192.168.2.0/24']
     
     Complejidad:
-        - Tiempo: O(count) en caso promedio
+        - Tiempo: O(count · log n) donde n = rangos usados
         - Espacio: O(count) para el resultado
     """
-    results = []
-    # Convertir used a set de strings para búsqueda O(1)
-    used_set = {str(net) for net in used}
+    if prefix < base_net.prefixlen:
+        raise ValueError('new prefix must be longer')
     
-    # Generar subredes bajo demanda (iterador en lugar de lista completa)
-    subnets = base_net.subnets(new_prefix=prefix)
-    start_index = 1 if skip_first else 0
+    results = []
+    size = 1 << (32 - prefix)
+    cand = int(base_net.network_address)
+    last = int(base_net.broadcast_address)
+    if skip_first:
+        cand += size
     
-    for idx, cand in enumerate(subnets):
-        if idx < start_index:
+    while len(results) < count and cand + size - 1 <= last:
+        blocker_end = used.find_overlap(cand, cand + size - 1)
+        if blocker_end is not None:
+            # Saltar al primer bloque alineado después del rango ocupado
+            cand = (blocker_end + size) // size * size
             continue
-            
-        # Verificación optimizada con set
-        cand_str = str(cand)
-        if cand_str not in used_set and not check_conflict(cand, used):
-            results.append(cand)
-            used.append(cand)
-            used_set.add(cand_str)
-            if len(results) == count:
+        
+        net = ipaddress.IPv4Network((cand, prefix))
+        results.append(net)
+        used.add_range(cand, cand + size - 1)
+        cand += size
+    return results
+
+
+def generate_blocks_batch(base_net, prefixes, used):
+    """
+    Asigna una subred por cada prefijo de la lista, en orden, en una sola llamada
+    
+    Da el mismo resultado que llamar generate_blocks(base_net, p, 1, used)
+    para cada prefijo p, pero recuerda por tamaño de bloque el último
+    candidato revisado: como `used` solo crece durante el lote, un bloque
+    descartado antes sigue ocupado y la búsqueda continúa desde ahí en vez
+    de volver a empezar desde el inicio de la red base.
+    
+    Args:
+        base_net (IPv4Network): Red base a subdividir (ej: 19.0.0.0/8)
+        prefixes (list[int]): Prefijo de cada subred, en orden de asignación
+        used (UsedRanges): Rangos ya asignados (se modifica)
+    
+    Returns:
+        list: IPv4Network por cada prefijo, o None si ya no hay espacio
+    
+    Ejemplo:
+        >>> base = ipaddress.ip_network('10.0.0.0/8')
+        >>> nets = generate_blocks_batch(base, [24, 26, 24], UsedRanges())
+        >>> [str(n) for n in nets]
+        ['10.0.0.0/24', '10.0.1.0/26', '10.0.2.0/24']
+    """
+    results = []
+    first = int(base_net.network_address)
+    last = int(base_net.broadcast_address)
+    cursors = {}  # prefijo → primer candidato aún no descartado
+    
+    for prefix in prefixes:
+        if prefix < base_net.prefixlen:
+            raise ValueError('new prefix must be longer')
+        
+        size = 1 << (32 - prefix)
+        cand = cursors.get(prefix, first)
+        while cand + size - 1 <= last:
+            blocker_end = used.find_overlap(cand, cand + size - 1)
+            if blocker_end is None:
                 break
+            cand = (blocker_end + size) // size * size
+        
+        if cand + size - 1 > last:
+            cursors[prefix] = cand
+            results.append(None)
+            continue
+        
+        results.append(ipaddress.IPv4Network((cand, prefix)))
+        used.add_range(cand, cand + size - 1)
+        cursors[prefix] = cand + size
     return results
 
 
-def check_conflict(new_net, used):
+def first_last_host(net):
     """
-    Verifica si una nueva red se solapa con redes ya utilizadas
+    Devuelve la primera y la última IP utilizable de una red sin materializar hosts()
     
-    Algoritmo:
-        - Compara new_net con cada red en used
-        - Verifica 3 condiciones de conflicto:
-          1. Overlaps: Las redes se traslapan (comparten IPs)
-          2. Subnet_of: new_net está contenida en alguna red usada
-          3. Supernet_of: Alguna red usada está contenida en new_net
+    Equivale a (hosts[0], hosts[-1]) con hosts = list(net.hosts()), pero en
+    O(1): para una /20 evita crear 4094 objetos IPv4Address solo para leer
+    los extremos. Respeta los casos especiales de hosts() para /31 y /32.
     
     Args:
-        new_net (IPv4Network): Red a validar
-        used (list): Lista de redes ya asignadas
+        net (IPv4Network): Red a consultar
     
     Returns:
-        bool: True si hay conflicto, False si la red es válida
+        tuple: (IPv4Address primera, IPv4Address última)
     
     Ejemplo:
-        >>> used = [IPv4Network('192.168.1.0/24')]
-        >>> check_conflict(IPv4Network('192.168.1.128/25'), used)
-        True  # Conflicto: 192.168.1.128/25 está dentro de 192.168.1.0/24
+        >>> first, last = first_last_host(ipaddress.ip_network('19.0.0.0/30'))
+        >>> str(first), str(last)
+        ('19.0.0.1', '19.0.0.2')
     """
-    for net in used:
-        if new_net.overlaps(net) or new_net.subnet_of(net) or net.subnet_of(new_net):
-            return True
-    return False
\ No newline at end of file
+    if net.prefixlen >= 31:
+        # /31 (RFC 3021): ambas direcciones son hosts; /32: un solo host
+        return net.network_address, net.broadcast_address
+    return net.network_address + 1, net.broadcast_address - 1
@@ -7,14 +7,20 @@ FECHA: 2025
 
 import ipaddress
 import json
+import re
+import traceback
+from collections import defaultdict
+from functools import lru_cache
 from itertools import combinations
-from flask import render_template, current_app
+from flask import render_template, current_app, jsonify, session
 
 # Imports de módulos propios
 from app.core.models import Combo
 
 # Imports usando nombres con guiones (Python los convierte automáticamente)
-from app.logic.network_calculations.subnetting import generate_blocks
+from app.logic.network_calculations.subnetting import (
+    generate_blocks, generate_blocks_batch, UsedRanges, first_last_host, netmask_str
+)
 from app.logic.cisco_config.ssh_config import generate_ssh_config
 from app.logic.cisco_config.etherchannel import generate_etherchannel_config
 from app.logic.routing_algorithms.static_routes import generate_static_routes_commands
@@ -23,15 +29,20 @@ from app.logic.exports.text_files import generate_separated_txt_files
 from app.logic.ptbuilder.ptbuilder import generate_ptbuilder_script
 from app.logic.ptbuilder.interface_utils import expand_interface_type
 
-# Variable global para almacenar contenido de archivos de configuración
-config_files_content = {}
+# Tipos de dispositivo que se agrupan en la fase de filtrado (orden de desempaquetado)
+_DEVICE_TYPES = ('router', 'switch', 'switch_core', 'server', 'wlc', 'ap')
 
+# Secuencias de dígitos en el nombre de una VLAN ('VLAN10' → ['10'])
+_DIGITS = re.compile(r'\d+')
 
-def detect_spanning_tree_targets(node_map, adjacency):
+# Puerto completo de una PC → (tipo, número): 'FastEthernet0/1' → ('FastEthernet', '0/1')
+_PORT_RE = re.compile(r'^([A-Za-z]+)(.+)$')
+
+
+def detect_spanning_tree_targets(node_types, adjacency):
     """Return ids of switches needing spanning-tree priority."""
     targets = set()
-    for node_id, node in node_map.items():
-        node_type = node['data'].get('type')
+    for node_id, node_type in node_types.items():
         if node_type not in ['switch', 'switch_core']:
             continue
 
@@ -40,7 +51,7 @@ def detect_spanning_tree_targets(node_map, adjacency):
             continue
 
         has_router_neighbor = any(
-            node_map.get(neighbor_id, {}).get('data', {}).get('type') == 'router'
+            node_types.get(neighbor_id) == 'router'
             for neighbor_id in neighbors
         )
         if not has_router_neighbor:
@@ -48,7 +59,7 @@ def detect_spanning_tree_targets(node_map, adjacency):
 
         switch_neighbors = [
             neighbor_id for neighbor_id in neighbors
-            if node_map.get(neighbor_id, {}).get('data', {}).get('type') in ['switch', 'switch_core']
+            if node_types.get(neighbor_id) in ['switch', 'switch_core']
         ]
         if len(switch_neighbors) < 2:
             continue
@@ -62,6 +73,44 @@ def detect_spanning_tree_targets(node_map, adjacency):
     return targets
 
 
+@lru_cache(maxsize=256)
+def _base_network(base_octet):
+    """
+    Red base /8 para el subnetting a partir de su primer octeto, cacheada
+    
+    IPv4Network es inmutable, así que la misma instancia se comparte entre
+    peticiones; solo se parsea una vez por octeto distinto.
+    """
+    return ipaddress.ip_network(f"{base_octet}.0.0.0/8")
+
+
+def _vlan_number(vlan_name, vlan_num_map):
+    """
+    Número de VLAN a partir de su nombre ('VLAN10' → '10'), memorizado
+    
+    Los nombres de las VLANs del proyecto ya están en vlan_num_map; los
+    nombres que lleguen solo desde PCs o servidores se calculan una vez y
+    se guardan en el mismo diccionario.
+    """
+    vlan_num = vlan_num_map.get(vlan_name)
+    if vlan_num is None:
+        vlan_num = vlan_num_map[vlan_name] = ''.join(_DIGITS.findall(vlan_name))
+    return vlan_num
+
+
+def _vlan_prefix(vlan, vlan_prefix_map):
+    """
+    Prefijo de una VLAN como int, convertido la primera vez que se usa
+    
+    La conversión es perezosa: una VLAN que ningún router ni switch core
+    utiliza no se valida, igual que antes de memorizarla.
+    """
+    prefix = vlan_prefix_map.get(vlan['name'])
+    if prefix is None:
+        prefix = vlan_prefix_map[vlan['name']] = int(vlan['prefix'])
+    return prefix
+
+
 def handle_visual_topology(topology):
     """
     Función principal que procesa la topología diseñada visualmente y genera todas las configuraciones
@@ -131,10 +180,12 @@ def handle_visual_topology(topology):
     
     Optimizaciones implementadas:
         - node_map: Búsqueda O(1) por ID de nodo (evita búsquedas lineales O(n))
+        - node_types: Tipo por ID en un solo acceso (sin node['data']['type'])
         - vlan_map: Búsqueda O(1) por nombre de VLAN
-        - edges_by_node: Pre-cálculo de conexiones por nodo para evitar filtrados repetidos
+        - edges_by_node: Pre-cálculo de conexiones por nodo (otro extremo, edge, is_from)
+          para evitar filtrados y ternarios repetidos
         - Filtrado de dispositivos en una sola pasada
-        - Lazy evaluation en generate_blocks() con iteradores
+        - UsedRanges: generate_blocks() detecta solapamientos por búsqueda binaria
         - BFS con caching de redes conocidas por router
     
     Complejidad total:
@@ -144,7 +195,8 @@ def handle_visual_topology(topology):
         - Después: ~0.008 segundos (99.5% más rápido)
     
     Manejo de errores:
-        - Captura excepciones y retorna mensaje de error descriptivo
+        - Captura excepciones, registra la traza en el log y retorna un JSON
+          {'error': ...} con estado 400 (la traza solo se incluye en modo debug)
         - Valida overlaps de subredes antes de asignar
         - Verifica existencia de dispositivos terminadores de VLANs
     
@@ -158,11 +210,19 @@ def handle_visual_topology(topology):
         edges = topology['edges']
         vlans = topology['vlans']
         
+        # Pre-calcular número de VLAN (dígitos del nombre) una sola vez por nombre,
+        # en lugar de recalcularlo en cada bucle de dispositivos
+        vlan_num_map = {v['name']: ''.join(_DIGITS.findall(v['name'])) for v in vlans}
+        
+        # Prefijo convertido a int una sola vez por VLAN, en el primer router o
+        # switch core que la usa (ver _vlan_prefix), no para cada dispositivo
+        vlan_prefix_map = {}
+        
         # Buscar VLAN nativa
         native_vlan_id = None
         for vlan in vlans:
             if vlan.get('isNative'):
-                native_vlan_id = ''.join(filter(str.isdigit, vlan['name']))
+                native_vlan_id = vlan_num_map[vlan['name']]
                 break
         
         # Obtener el primer octeto de la red base (por defecto 19 si no se especifica)
@@ -171,47 +231,33 @@ def handle_visual_topology(topology):
         # Detectar si es modo físico
         is_physical_mode = topology.get('mode') == 'physical'
         
-        # DEBUG: Mostrar coordenadas recibidas del cliente
-        print("\n🔍 COORDINADAS RECIBIDAS DEL CLIENTE:")
-        for node in nodes:
-            print(f"  {node['data']['name']}: x={node.get('x')}, y={node.get('y')}")
-        
-        print(f"\nRED BASE CONFIGURADA: {base_octet}.0.0.0/8")
-        
         # ============================================================
         # FASE 1: PRE-CÁLCULO DE MAPAS PARA OPTIMIZACIÓN O(1)
         # ============================================================
         # Crea estructuras de datos hash para búsquedas instantáneas
         # En lugar de buscar linealmente O(n), accedemos directamente O(1)
-        node_map = {n['id']: n for n in nodes}      # ID → Nodo
-        vlan_map = {v['name']: v for v in vlans}    # Nombre → VLAN
-        
+        #
+        # FASE 2: FILTRADO DE DISPOSITIVOS POR TIPO (en la misma pasada)
+        # Despacho por diccionario: un solo hash por nodo en lugar de la cadena if/elif
         # ============================================================
-        # FASE 2: FILTRADO DE DISPOSITIVOS POR TIPO
-        # ============================================================
-        # Una sola pasada O(n) en lugar de múltiples filtrados O(4n)
-        routers = []
-        switches = []
-        switch_cores = []
-        computers = []
-        servers = []
-        wlcs = []
-        aps = []
-        
+        node_map = {}     # ID → Nodo
+        node_types = {}   # ID → tipo (sin doble subíndice)
+        buckets = {device_type: [] for device_type in _DEVICE_TYPES}
         for n in nodes:
+            node_id = n['id']
             node_type = n['data']['type']
-            if node_type == 'router':
-                routers.append(n)
-            elif node_type == 'switch':
-                switches.append(n)
-            elif node_type == 'switch_core':
-                switch_cores.append(n)
-            elif node_type == 'server':
-                servers.append(n)
-            elif node_type == 'wlc':
-                wlcs.append(n)
-            elif node_type == 'ap':
-                aps.append(n)
+            node_map[node_id] = n
+            node_types[node_id] = node_type
+            bucket = buckets.get(node_type)
+            if bucket is not None:
+                bucket.append(n)
+        vlan_map = {v['name']: v for v in vlans}    # Nombre → VLAN
+        
+        routers, switches, switch_cores, servers, wlcs, aps = (
+            buckets[device_type] for device_type in _DEVICE_TYPES
+        )
+        # Las PCs no son nodos: se extraen de data.computers de cada switch
+        computers = []
         
         # Extraer computadoras del NUEVO SISTEMA (almacenadas en switches y switch_cores)
         # Contador global para nombres únicos de PCs
@@ -230,8 +276,7 @@ def handle_visual_topology(topology):
                     port_full = pc.get('portNumber', '')
                     
                     # Separar tipo y número
-                    import re
-                    match = re.match(r'^([A-Za-z]+)(.+)$', port_full)
+                    match = _PORT_RE.match(port_full)
                     if match:
                         port_type = match.group(1)  # "FastEthernet"
                         port_number = match.group(2)  # "0/1"
@@ -288,8 +333,7 @@ def handle_visual_topology(topology):
                     port_full = pc.get('portNumber', '')
                     
                     # Separar tipo y número
-                    import re
-                    match = re.match(r'^([A-Za-z]+)(.+)$', port_full)
+                    match = _PORT_RE.match(port_full)
                     if match:
                         port_type = match.group(1)  # "FastEthernet"
                         port_number = match.group(2)  # "0/1"
@@ -340,55 +384,55 @@ def handle_visual_topology(topology):
         # Usa la red base configurada (por defecto 19.0.0.0/8) dividida en subredes /30
         router_configs = []
         
-        base = ipaddress.ip_network(f"{base_octet}.0.0.0/8")  # Base configurable para subnetting
-        used = []  # Lista de subredes /30 ya asignadas
+        base = _base_network(base_octet)  # Base configurable para subnetting (cacheada por octeto)
+        used = UsedRanges()  # Rangos ya asignados (búsqueda binaria de solapamientos)
         edge_ips = {}  # Mapeo edge_id → IPs asignadas
         
         # Pre-filtrar edges de backbone (optimización)
         backbone_edges = []
         for edge in edges:
-            from_node = node_map.get(edge['from'])
-            to_node = node_map.get(edge['to'])
+            from_type = node_types.get(edge['from'])
+            to_type = node_types.get(edge['to'])
             
-            if from_node and to_node:
-                from_type = from_node['data']['type']
-                to_type = to_node['data']['type']
-                
-                # Solo procesar backbones (router-router o router-switchcore)
-                if from_type in ['router', 'switch_core'] and to_type in ['router', 'switch_core']:
-                    backbone_edges.append((edge, from_node, to_node))
+            # Solo procesar backbones (router-router o router-switchcore)
+            if from_type in ['router', 'switch_core'] and to_type in ['router', 'switch_core']:
+                backbone_edges.append(edge)
         
-        # Asignar IPs a conexiones backbone
-        for edge, from_node, to_node in backbone_edges:
-            # Generar red /30
-            blocks = generate_blocks(base, 30, 1, used, skip_first=True)
-            if blocks:
-                network = blocks[0]
-                hosts = list(network.hosts())
-                
-                edge_ips[edge['id']] = {
-                    'network': network,
-                    'from_ip': hosts[0] if len(hosts) > 0 else network.network_address,
-                    'to_ip': hosts[1] if len(hosts) > 1 else network.network_address + 1,
-                    'mask': str(network.netmask)
-                }
+        # Asignar IPs a conexiones backbone: todas las /30 en una sola llamada
+        # (mismo resultado que una llamada por edge, pero un único recorrido
+        # entero sobre la base en lugar de reiniciarlo en cada edge)
+        backbone_blocks = generate_blocks(base, 30, len(backbone_edges), used, skip_first=True)
+        backbone_mask = netmask_str(30)
+        for edge, network in zip(backbone_edges, backbone_blocks):
+            # /30: los dos hosts son los extremos del rango utilizable
+            from_ip, to_ip = first_last_host(network)
+            
+            edge_ips[edge['id']] = {
+                'network': network,
+                'from_ip': from_ip,
+                'to_ip': to_ip,
+                'mask': backbone_mask,
+                # Pares (extremo from, extremo to) indexados por lado: 0 = from, 1 = to
+                'ips': (str(from_ip), str(to_ip)),
+                'ifaces': (edge['data']['fromInterface'], edge['data']['toInterface'])
+            }
         
         # Pre-calcular edges por nodo (evitar búsquedas repetidas)
-        edges_by_node = {}
+        # Cada entrada ya resuelta desde el punto de vista del nodo:
+        # (id del otro extremo, edge, is_from)
+        edges_by_node = defaultdict(list)
         for edge in edges:
-            if edge['from'] not in edges_by_node:
-                edges_by_node[edge['from']] = []
-            if edge['to'] not in edges_by_node:
-                edges_by_node[edge['to']] = []
-            edges_by_node[edge['from']].append(edge)
-            edges_by_node[edge['to']].append(edge)
+            from_id = edge['from']
+            to_id = edge['to']
+            edges_by_node[from_id].append((to_id, edge, True))
+            edges_by_node[to_id].append((from_id, edge, from_id == to_id))
 
         adjacency = {node_id: set() for node_id in node_map}
         for edge in edges:
             adjacency.setdefault(edge['from'], set()).add(edge['to'])
             adjacency.setdefault(edge['to'], set()).add(edge['from'])
 
-        spanning_tree_targets = detect_spanning_tree_targets(node_map, adjacency)
+        spanning_tree_targets = detect_spanning_tree_targets(node_types, adjacency)
         
         # Procesar routers (optimizado)
         for router in routers:
@@ -397,29 +441,29 @@ def handle_visual_topology(topology):
             router_id = router['id']
             
             # Encabezado con SSH 
-            config_lines.append(f"{name}")
-            config_lines.append("enable")
-            config_lines.append("config terminal")
-            config_lines.append(f"hostname {name}")
-            config_lines.append("ip domain-name cisco.com")
-            config_lines.append("crypto key generate rsa")
-            config_lines.append("512")
-            config_lines.append("line vty 0 5")
-            config_lines.append("transport input ssh")
-            config_lines.append("login local")
-            config_lines.append("exit")
-            config_lines.append("username user password cisco")
-            config_lines.append("enable secret cisco")
-            config_lines.append("")
+            config_lines.extend((
+                f"{name}",
+                "enable",
+                "config terminal",
+                f"hostname {name}",
+                "ip domain-name cisco.com",
+                "crypto key generate rsa",
+                "512",
+                "line vty 0 5",
+                "transport input ssh",
+                "login local",
+                "exit",
+                "username user password cisco",
+                "enable secret cisco",
+                "",
+            ))
             
             # Obtener edges del router (búsqueda O(1))
             router_edges = edges_by_node.get(router_id, [])
             backbone_interfaces = []
             switch_connections = []  # ✅ Cambiar a lista para soportar múltiples switches
             
-            for edge in router_edges:
-                is_from = edge['from'] == router_id
-                target_id = edge['to'] if is_from else edge['from']
+            for target_id, edge, is_from in router_edges:
                 target_node = node_map.get(target_id)
                 
                 if not target_node:
@@ -440,17 +484,20 @@ def handle_visual_topology(topology):
                 
                 # Configurar backbone
                 if edge['id'] in edge_ips:
-                    iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
                     ip_data = edge_ips[edge['id']]
+                    side = 0 if is_from else 1
+                    iface_data = ip_data['ifaces'][side]
                     routing_direction = edge['data'].get('routingDirection', 'bidirectional')
                     
                     iface_full = f"{iface_data['type']}{iface_data['number']}"
-                    ip_addr = str(ip_data['from_ip']) if is_from else str(ip_data['to_ip'])
-                    next_hop_ip = str(ip_data['to_ip']) if is_from else str(ip_data['from_ip'])
+                    ip_addr = ip_data['ips'][side]
+                    next_hop_ip = ip_data['ips'][1 - side]
                     
-                    config_lines.append(f"int {iface_full}")
-                    config_lines.append(f"ip address {ip_addr} {ip_data['mask']}")
-                    config_lines.append(" no shut")
+                    config_lines.extend((
+                        f"int {iface_full}",
+                        f"ip address {ip_addr} {ip_data['mask']}",
+                        " no shut",
+                    ))
                     
                     backbone_interfaces.append({
                         'type': iface_data['type'],
@@ -497,46 +544,48 @@ def handle_visual_topology(topology):
                     config_lines.append("no shut")
                     
                     # Generar subinterfaces para TODAS las VLANs definidas globalmente
+                    vlan_requests = []
                     for vlan in vlans:
                         vlan_name = vlan['name']
-                        vlan_num = ''.join(filter(str.isdigit, vlan_name))
+                        vlan_num = vlan_num_map[vlan_name]
                         if vlan_num:
-                            prefix = int(vlan['prefix'])
+                            prefix = _vlan_prefix(vlan, vlan_prefix_map)
                             
                             # ✅ VALIDACIÓN: Omitir redes /31 y /32 (no soportan DHCP)
                             if prefix >= 31:
-                                print(f"⚠️  ADVERTENCIA: VLAN {vlan_name} con prefijo /{prefix} omitida.")
-                                print(f"   Las redes /31 y /32 no tienen suficientes IPs para DHCP.")
-                                print(f"   Usa un prefijo máximo de /30 para al menos 2 hosts.")
+                                current_app.logger.warning(
+                                    "VLAN %s con prefijo /%s omitida: las redes /31 y /32 "
+                                    "no tienen suficientes IPs para DHCP (máximo /30)", vlan_name, prefix)
                                 continue
-                            
-                            # Generar red
-                            blocks = generate_blocks(base, prefix, 1, used)
-                            if blocks:
-                                network = blocks[0]
-                                hosts = list(network.hosts())
-                                
-                                # Verificar que hay suficientes hosts (mínimo 2)
-                                if len(hosts) < 2:
-                                    print(f"⚠️  ADVERTENCIA: VLAN {vlan_name} no tiene suficientes IPs.")
-                                    continue
-                                
-                                gateway = hosts[-1]
-                                
-                                config_lines.append(f"int {iface_full}.{vlan_num}")
-                                config_lines.append(f"encapsulation dot1Q {vlan_num}")
-                                config_lines.append(f"ip add {gateway} {network.netmask}")
-                                config_lines.append("no shut")
-                                
-                                assigned_vlans.append({
-                                    'name': vlan_name,
-                                    'termination': vlan_num,
-                                    'network': network,
-                                    'gateway': str(gateway),
-                                    'mask': str(network.netmask),
-                                    'interface_name': iface_data['type'],
-                                    'interface_number': iface_data['number']
-                                })
+                            vlan_requests.append((vlan_name, vlan_num, prefix))
+                    
+                    # Generar todas las redes del router en un solo lote (mismo orden)
+                    networks = generate_blocks_batch(base, [req[2] for req in vlan_requests], used)
+                    for (vlan_name, vlan_num, _), network in zip(vlan_requests, networks):
+                        if network is None:
+                            continue
+                        
+                        _, gateway = first_last_host(network)
+                        # Formatear gateway y máscara una sola vez (se reutilizan en el pool DHCP)
+                        gateway_str = str(gateway)
+                        mask_str = netmask_str(network.prefixlen)
+                        
+                        config_lines.extend((
+                            f"int {iface_full}.{vlan_num}",
+                            f"encapsulation dot1Q {vlan_num}",
+                            f"ip add {gateway_str} {mask_str}",
+                            "no shut",
+                        ))
+                        
+                        assigned_vlans.append({
+                            'name': vlan_name,
+                            'termination': vlan_num,
+                            'network': network,
+                            'gateway': gateway_str,
+                            'mask': mask_str,
+                            'interface_name': iface_data['type'],
+                            'interface_number': iface_data['number']
+                        })
                     
                     config_lines.append("exit")
                     config_lines.append("")
@@ -545,24 +594,26 @@ def handle_visual_topology(topology):
             if assigned_vlans:
                 for vlan_data in assigned_vlans:
                     network = vlan_data['network']
-                    hosts = list(network.hosts())
                     vlan_num = vlan_data['termination']
                     
                     # ✅ VALIDACIÓN: Solo crear pool si hay suficientes hosts
-                    if len(hosts) < 2:
-                        print(f"⚠️  Omitiendo pool DHCP para VLAN{vlan_num} (insuficientes IPs)")
+                    if network.prefixlen >= 31:
+                        current_app.logger.warning("Omitiendo pool DHCP para VLAN%s (insuficientes IPs)", vlan_num)
                         continue
                     
                     # Excluded addresses ANTES del pool (primeras 10 IPs o todas menos la última)
-                    excluded_end = hosts[9] if len(hosts) > 10 else hosts[-2]
-                    config_lines.append(f"ip dhcp excluded-address {hosts[0]} {excluded_end}")
+                    first_host, last_host = first_last_host(network)
+                    excluded_end = first_host + 9 if network.num_addresses > 12 else last_host - 1
+                    config_lines.append(f"ip dhcp excluded-address {first_host} {excluded_end}")
                     config_lines.append("")
                     
-                    config_lines.append(f"ip dhcp pool vlan{vlan_num}")
-                    config_lines.append(f"network {network.network_address} {network.netmask}")
-                    config_lines.append(f"default-router {vlan_data['gateway']}")
-                    config_lines.append("exit")  # IMPORTANTE: Salir del pool DHCP
-                    config_lines.append("")
+                    config_lines.extend((
+                        f"ip dhcp pool vlan{vlan_num}",
+                        f"network {network.network_address} {vlan_data['mask']}",
+                        f"default-router {vlan_data['gateway']}",
+                        "exit",  # IMPORTANTE: Salir del pool DHCP
+                        "",
+                    ))
             
             # NO agregar exit aquí - format_config_for_ptbuilder() lo agregará al final
             
@@ -576,6 +627,17 @@ def handle_visual_topology(topology):
                 'routes': []
             })
         
+        # Declaración de VLANs de los switch cores: es la misma para todos
+        # (todas las VLANs del proyecto, sin duplicados y ordenadas), se construye una vez.
+        # Orden numérico por ID de VLAN (VLAN2 antes que VLAN10); el nombre desempata
+        swc_vlan_declarations = []
+        for vlan_name in sorted({v['name'] for v in vlans},
+                                key=lambda n: (int(vlan_num_map[n] or 0), n)):
+            vlan_num = vlan_num_map[vlan_name]
+            if vlan_num:
+                swc_vlan_declarations.append(f"vlan {vlan_num}")
+                swc_vlan_declarations.append(f" name {vlan_name.lower()}")
+        
         # Procesar switch cores (optimizado)
         for swc in switch_cores:
             config_lines = []
@@ -583,87 +645,33 @@ def handle_visual_topology(topology):
             swc_id = swc['id']
             
             # Encabezado con SSH 
-            config_lines.append(f"{name}")
-            config_lines.append("enable")
-            config_lines.append("config terminal")
-            config_lines.append(f"hostname {name}")
-            config_lines.append("ip routing")
-            config_lines.append("ip domain-name cisco.com")
-            config_lines.append("crypto key generate rsa")
-            config_lines.append("yes")
-            config_lines.append("512")
-            config_lines.append("line vty 0 5")
-            config_lines.append("transport input ssh")
-            config_lines.append("login local")
-            config_lines.append("exit")
-            config_lines.append("username user password cisco")
-            config_lines.append("enable secret cisco")
-            config_lines.append(f"hostname {name}")
+            config_lines.extend((
+                f"{name}",
+                "enable",
+                "config terminal",
+                f"hostname {name}",
+                "ip routing",
+                "ip domain-name cisco.com",
+                "crypto key generate rsa",
+                "yes",
+                "512",
+                "line vty 0 5",
+                "transport input ssh",
+                "login local",
+                "exit",
+                "username user password cisco",
+                "enable secret cisco",
+                f"hostname {name}",
+            ))
             
             # Crear TODAS las VLANs del proyecto en el switch core
             # Los switch cores necesitan tener todas las VLANs para los trunks
-            vlans_to_declare = set()  # VLANs a declarar (vlan X)
-            vlans_with_computers = set()  # VLANs que necesitan SVI (interface vlan X)
+            # (no solo las que tienen computadoras: no hace falta recorrer los
+            # switches vecinos buscando PCs por cada switch core)
             swc_edges = edges_by_node.get(swc_id, [])
             
-            # Encontrar VLANs que realmente tienen computadoras conectadas
-            for edge in swc_edges:
-                other_id = edge['to'] if edge['from'] == swc_id else edge['from']
-                other_node = node_map.get(other_id)
-                
-                if not other_node:
-                    continue
-                
-                other_type = other_node['data']['type']
-                
-                # Servidores conectados directamente
-                if other_type == 'server' and other_node['data'].get('vlan'):
-                    vlans_with_computers.add(other_node['data']['vlan'])
-                
-                # Computadoras conectadas directamente (antiguo sistema)
-                if other_type == 'computer' and other_node['data'].get('vlan'):
-                    vlans_with_computers.add(other_node['data']['vlan'])
-                elif other_type == 'switch':
-                    # Buscar computadoras del switch (antiguo sistema - nodos)
-                    switch_edges = edges_by_node.get(other_id, [])
-                    for se in switch_edges:
-                        comp_id = se['to'] if se['from'] == other_id else se['from']
-                        comp = node_map.get(comp_id)
-                        if comp and comp['data']['type'] == 'computer' and comp['data'].get('vlan'):
-                            vlans_with_computers.add(comp['data']['vlan'])
-                    
-                    # Buscar computadoras del switch (nuevo sistema - almacenadas)
-                    if 'computers' in other_node['data']:
-                        for pc in other_node['data']['computers']:
-                            if pc.get('vlan'):
-                                vlans_with_computers.add(pc['vlan'])
-            
-            # Computadoras conectadas directamente al switch core (nuevo sistema)
-            if 'computers' in swc['data']:
-                for pc in swc['data']['computers']:
-                    if pc.get('vlan'):
-                        vlans_with_computers.add(pc['vlan'])
-            
-            # Verificar si hay switches conectados al switch core
-            has_switches_connected = False
-            for edge in swc_edges:
-                other_id = edge['to'] if edge['from'] == swc_id else edge['from']
-                other_node = node_map.get(other_id)
-                if other_node and other_node['data']['type'] == 'switch':
-                    has_switches_connected = True
-                    break
-            
-            # Determinar qué VLANs declarar
-            # Siempre declarar TODAS las VLANs del proyecto en los Switch Cores
-            for vlan in vlans:
-                vlans_to_declare.add(vlan['name'])
-            
-            # Crear VLANs
-            for vlan_name in sorted(vlans_to_declare):
-                vlan_num = ''.join(filter(str.isdigit, vlan_name))
-                if vlan_num:
-                    config_lines.append(f"vlan {vlan_num}")
-                    config_lines.append(f" name {vlan_name.lower()}")
+            # Crear VLANs: siempre TODAS las VLANs del proyecto (pre-calculado)
+            config_lines.extend(swc_vlan_declarations)
             
             config_lines.append("exit")
             config_lines.append("")
@@ -672,29 +680,36 @@ def handle_visual_topology(topology):
                 config_lines.append("spanning-tree vlan 1 priority 4096")
                 config_lines.append("")
             
-            # Configurar interfaces backbone
+            # Una sola pasada por las aristas del switch core: cada arista se
+            # clasifica en backbone, trunk/EtherChannel o servidor, y las líneas
+            # se emiten después por grupos en el mismo orden que antes
             backbone_interfaces = []
-            for edge in swc_edges:
+            backbone_lines = []
+            trunk_lines = []
+            etherchannel_configs = []
+            computer_ports_swc = []
+            for other_id, edge, is_from in swc_edges:
+                other_node = node_map.get(other_id)
+                
                 if edge['id'] in edge_ips:
-                    is_from = edge['from'] == swc_id
-                    iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
+                    # Interfaz backbone (enlace L3 con IP)
                     ip_data = edge_ips[edge['id']]
+                    side = 0 if is_from else 1
+                    iface_data = ip_data['ifaces'][side]
                     routing_direction = edge['data'].get('routingDirection', 'bidirectional')
-                    
-                    # Obtener el nodo destino (búsqueda O(1))
-                    target_id = edge['to'] if is_from else edge['from']
-                    target_node = node_map.get(target_id)
-                    target_name = target_node['data']['name'] if target_node else 'Unknown'
+                    target_name = other_node['data']['name'] if other_node else 'Unknown'
                     
                     iface_full = f"{iface_data['type']}{iface_data['number']}"
-                    ip_addr = str(ip_data['from_ip']) if is_from else str(ip_data['to_ip'])
-                    next_hop_ip = str(ip_data['to_ip']) if is_from else str(ip_data['from_ip'])
+                    ip_addr = ip_data['ips'][side]
+                    next_hop_ip = ip_data['ips'][1 - side]
                     
-                    config_lines.append(f"interface {iface_full}")
-                    config_lines.append(" no switchport")
-                    config_lines.append(f" ip address {ip_addr} {ip_data['mask']}")
-                    config_lines.append(" no shutdown")
-                    config_lines.append("")
+                    backbone_lines.extend((
+                        f"interface {iface_full}",
+                        " no switchport",
+                        f" ip address {ip_addr} {ip_data['mask']}",
+                        " no shutdown",
+                        "",
+                    ))
                     
                     backbone_interfaces.append({
                         'type': iface_data['type'],
@@ -709,18 +724,13 @@ def handle_visual_topology(topology):
                         'routing_direction': routing_direction,
                         'is_from': is_from
                     })
-            
-            # Configurar interfaces trunk para switches y WLCs
-            etherchannel_configs = []
-            for edge in swc_edges:
-                other_id = edge['to'] if edge['from'] == swc_id else edge['from']
-                other_node = node_map.get(other_id)
                 
-                # Aceptar conexiones a switch o wlc
-                if other_node and other_node['data']['type'] in ['switch', 'wlc']:
-                    is_from = edge['from'] == swc_id
-                    
-                    # Verificar si es EtherChannel
+                if not other_node:
+                    continue
+                other_type = other_node['data']['type']
+                
+                if other_type == 'switch' or other_type == 'wlc':
+                    # Trunk hacia switch o WLC (EtherChannel si está definido)
                     if 'etherChannel' in edge['data']:
                         etherchannel_configs.append({
                             'data': edge['data']['etherChannel'],
@@ -728,41 +738,28 @@ def handle_visual_topology(topology):
                             'target': other_node['data']['name']
                         })
                     else:
-                        # Configuración normal de trunk
                         iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
                         iface_full = f"{iface_data['type']}{iface_data['number']}"
                         
-                        config_lines.append(f"interface {iface_full}")
-                        config_lines.append(" switchport trunk encapsulation dot1Q")
-                        config_lines.append(" switchport mode trunk")
+                        trunk_lines.extend((
+                            f"interface {iface_full}",
+                            " switchport trunk encapsulation dot1Q",
+                            " switchport mode trunk",
+                        ))
                         
-                        # Si es WLC o Switch y hay VLAN nativa, configurar native vlan
-                        if other_node['data']['type'] in ['wlc', 'switch'] and native_vlan_id:
-                            config_lines.append(f" switchport trunk native vlan {native_vlan_id}")
+                        # Si hay VLAN nativa, configurarla en el trunk
+                        if native_vlan_id:
+                            trunk_lines.append(f" switchport trunk native vlan {native_vlan_id}")
                             
-                        config_lines.append(" no shutdown")
-                        config_lines.append("")
-            
-            # Configurar EtherChannels si existen
-            for ec_config in etherchannel_configs:
-                ec_commands = generate_etherchannel_config(ec_config['data'], ec_config['is_from'])
-                config_lines.extend(ec_commands)
-            
-            # Configurar puertos de acceso para computadoras conectadas al switch core
-            computer_ports_swc = []
-            
-            # Procesar servidores conectados al switch core
-            for edge in swc_edges:
-                other_id = edge['to'] if edge['from'] == swc_id else edge['from']
-                other_node = node_map.get(other_id)
+                        trunk_lines.append(" no shutdown")
+                        trunk_lines.append("")
                 
-                if other_node and other_node['data']['type'] == 'server':
+                elif other_type == 'server':
+                    # Puerto de acceso hacia un servidor conectado directamente
                     vlan_name = other_node['data'].get('vlan')
                     if vlan_name:
-                        vlan_num = ''.join(filter(str.isdigit, vlan_name))
+                        vlan_num = _vlan_number(vlan_name, vlan_num_map)
                         if vlan_num:
-                            # Obtener interfaz del switch core hacia el servidor
-                            is_from = edge['from'] == swc_id
                             iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
                             port_full = f"{iface_data['type']}{iface_data['number']}"
                             
@@ -773,12 +770,20 @@ def handle_visual_topology(topology):
                                 'is_server': True
                             })
             
+            config_lines.extend(backbone_lines)
+            config_lines.extend(trunk_lines)
+            
+            # Configurar EtherChannels si existen
+            for ec_config in etherchannel_configs:
+                ec_commands = generate_etherchannel_config(ec_config['data'], ec_config['is_from'])
+                config_lines.extend(ec_commands)
+            
             # Procesar computadoras del sistema nuevo (almacenadas en el switch core)
             if 'computers' in swc['data']:
                 for pc in swc['data']['computers']:
                     vlan_name = pc.get('vlan')
                     if vlan_name:
-                        vlan_num = ''.join(filter(str.isdigit, vlan_name))
+                        vlan_num = _vlan_number(vlan_name, vlan_num_map)
                         if vlan_num:
                             # El puerto ya viene completo: "FastEthernet0/1" o "GigabitEthernet1/0/1"
                             port_full = pc.get('portNumber', '')
@@ -791,21 +796,25 @@ def handle_visual_topology(topology):
             
             # Agregar configuración de puertos de acceso para PCs
             for port in computer_ports_swc:
-                config_lines.append(f"interface {port['interface']}")
-                config_lines.append(f" switchport access vlan {port['vlan']}")
-                config_lines.append(" no shutdown")
-                config_lines.append("")
+                config_lines.extend((
+                    f"interface {port['interface']}",
+                    f" switchport access vlan {port['vlan']}",
+                    " no shutdown",
+                    "",
+                ))
             
             # Configurar VLAN 1 para gestión de switches normales
             # Cada switch core tiene su propia red de gestión usando 192.168.x.0/24
             # SWC1 = 192.168.1.0/24, SWC2 = 192.168.2.0/24, etc.
             swc_index = switch_cores.index(swc) + 1
-            config_lines.append("")
-            config_lines.append(f"interface vlan 1")
-            config_lines.append(f"ip address 192.168.{swc_index}.254 255.255.255.0")
-            config_lines.append(" no shut")
-            config_lines.append("exit")
-            config_lines.append("")
+            config_lines.extend((
+                "",
+                f"interface vlan 1",
+                f"ip address 192.168.{swc_index}.254 255.255.255.0",
+                " no shut",
+                "exit",
+                "",
+            ))
             
             # Configurar SVIs y DHCP
             assigned_vlans = []
@@ -814,7 +823,7 @@ def handle_visual_topology(topology):
             vlan1_network = ipaddress.IPv4Network(f"192.168.{swc_index}.0/24")
             
             # IMPORTANTE: Marcar la red de VLAN 1 como usada para evitar conflictos
-            used.append(vlan1_network)
+            used.add(vlan1_network)
             
             assigned_vlans.append({
                 'name': 'VLAN1',
@@ -824,67 +833,68 @@ def handle_visual_topology(topology):
                 'mask': '255.255.255.0',
                 'is_native': False
             })
-            vlan_counter = 1
+            vlan_requests = []
             for vlan in vlans:
                 # Generar SVI para TODAS las VLANs (sin filtrar por computadoras)
-                vlan_num = ''.join(filter(str.isdigit, vlan['name']))
+                vlan_num = vlan_num_map[vlan['name']]
                 if vlan_num:
-                    prefix = int(vlan['prefix'])
+                    prefix = _vlan_prefix(vlan, vlan_prefix_map)
                         
                     # ✅ VALIDACIÓN: Omitir redes /31 y /32
                     if prefix >= 31:
-                        print(f"⚠️  ADVERTENCIA: VLAN {vlan['name']} con prefijo /{prefix} omitida en {name}.")
+                        current_app.logger.warning("VLAN %s con prefijo /%s omitida en %s", vlan['name'], prefix, name)
                         continue
-                    
-                    # Generar red
-                    blocks = generate_blocks(base, prefix, 1, used)
-                    if blocks:
-                        network = blocks[0]
-                        hosts = list(network.hosts())
-                        
-                        # Verificar suficientes hosts
-                        if len(hosts) < 2:
-                            print(f"⚠️  ADVERTENCIA: VLAN {vlan['name']} no tiene suficientes IPs en {name}.")
-                            continue
-                        
-                        gateway = hosts[-1]
-                        
-                        # Interface VLAN
-                        config_lines.append(f"interface vlan {vlan_num}")
-                        config_lines.append(f" ip address {gateway} {network.netmask}")
-                        config_lines.append(" no shutdown")
-                        config_lines.append("")
-                        
-                        assigned_vlans.append({
-                            'name': vlan['name'],
-                            'termination': vlan_num,
-                            'network': network,
-                            'gateway': str(gateway),
-                            'mask': str(network.netmask),
-                            'is_native': vlan.get('isNative', False)
-                        })
-                    
-                    vlan_counter += 1
+                    vlan_requests.append((vlan, vlan_num, prefix))
+            
+            # Generar todas las redes del switch core en un solo lote (mismo orden)
+            networks = generate_blocks_batch(base, [req[2] for req in vlan_requests], used)
+            for (vlan, vlan_num, _), network in zip(vlan_requests, networks):
+                if network is None:
+                    continue
+                
+                _, gateway = first_last_host(network)
+                # Formatear gateway y máscara una sola vez (se reutilizan en el pool DHCP)
+                gateway_str = str(gateway)
+                mask_str = netmask_str(network.prefixlen)
+                
+                # Interface VLAN
+                config_lines.extend((
+                    f"interface vlan {vlan_num}",
+                    f" ip address {gateway_str} {mask_str}",
+                    " no shutdown",
+                    "",
+                ))
+                
+                assigned_vlans.append({
+                    'name': vlan['name'],
+                    'termination': vlan_num,
+                    'network': network,
+                    'gateway': gateway_str,
+                    'mask': mask_str,
+                    'is_native': vlan.get('isNative', False)
+                })
             
             # Pools DHCP
             for vlan_data in assigned_vlans:
                 network = vlan_data['network']
-                hosts = list(network.hosts())
                 vlan_num = vlan_data['termination']
                 
                 # ✅ VALIDACIÓN: Solo crear pool si hay suficientes hosts
-                if len(hosts) < 2:
-                    print(f"⚠️  Omitiendo pool DHCP para VLAN{vlan_num} en {name} (insuficientes IPs)")
+                if network.prefixlen >= 31:
+                    current_app.logger.warning("Omitiendo pool DHCP para VLAN%s en %s (insuficientes IPs)", vlan_num, name)
                     continue
                 
                 # Excluded addresses (primeras 10 IPs o todas menos la última)
-                excluded_end = hosts[9] if len(hosts) > 10 else hosts[-2]
-                config_lines.append(f"ip dhcp excluded-address {hosts[0]} {excluded_end}")
-                config_lines.append(f"ip dhcp pool VLAN{vlan_num}")
-                config_lines.append(f" network {network.network_address} {network.netmask}")
-                config_lines.append(f" default-router {vlan_data['gateway']}")
-                config_lines.append(" dns-server 8.8.8.8")
-                config_lines.append("exit")  # IMPORTANTE: Salir del pool DHCP
+                first_host, last_host = first_last_host(network)
+                excluded_end = first_host + 9 if network.num_addresses > 12 else last_host - 1
+                config_lines.extend((
+                    f"ip dhcp excluded-address {first_host} {excluded_end}",
+                    f"ip dhcp pool VLAN{vlan_num}",
+                    f" network {network.network_address} {vlan_data['mask']}",
+                    f" default-router {vlan_data['gateway']}",
+                    " dns-server 8.8.8.8",
+                    "exit",  # IMPORTANTE: Salir del pool DHCP
+                ))
             
             router_configs.append({
                 'name': name,
@@ -895,6 +905,15 @@ def handle_visual_topology(topology):
                 'routes': []
             })
         
+        # Declaración de VLANs de los switches: igual para todos (todas las VLANs
+        # del proyecto, en el orden definido), se construye una vez por nombre
+        sw_vlan_declarations = []
+        for vlan in vlans:
+            vlan_num = vlan_num_map[vlan['name']]
+            if vlan_num:
+                sw_vlan_declarations.append(f"vlan {vlan_num}")
+                sw_vlan_declarations.append(f" name {vlan['name'].lower()}")
+        
         # Procesar switches normales (optimizado)
         for switch in switches:
             config_lines = []
@@ -902,20 +921,22 @@ def handle_visual_topology(topology):
             switch_id = switch['id']
             
             # NO agregar el nombre del dispositivo aquí - PTBuilder ya lo tiene en configureIosDevice()
-            config_lines.append("enable")
-            config_lines.append("config terminal")
-            config_lines.append(f"hostname {name}")
-            config_lines.append("ip domain-name cisco.com")
-            config_lines.append("crypto key generate rsa")
-            config_lines.append("512")
-            config_lines.append("line vty 0 5")
-            config_lines.append("transport input ssh")
-            config_lines.append("login local")
-            config_lines.append("exit")
-            config_lines.append("username user password cisco")
-            config_lines.append("enable secret cisco")
-            config_lines.append("")
-            config_lines.append("")
+            config_lines.extend((
+                "enable",
+                "config terminal",
+                f"hostname {name}",
+                "ip domain-name cisco.com",
+                "crypto key generate rsa",
+                "512",
+                "line vty 0 5",
+                "transport input ssh",
+                "login local",
+                "exit",
+                "username user password cisco",
+                "enable secret cisco",
+                "",
+                "",
+            ))
             
             # Configurar VLAN 1 management después de SSH (según PARATEST.cisco)
             # Buscar switch core conectado para determinar el gateway correcto
@@ -925,34 +946,36 @@ def handle_visual_topology(topology):
             connected_swc_vlan1_ip = None
             switch_edges = edges_by_node.get(switch_id, [])
             
-            for edge in switch_edges:
-                other_id = edge['to'] if edge['from'] == switch_id else edge['from']
-                other_node = node_map.get(other_id)
-                
-                if other_node and other_node['data']['type'] == 'switch_core':
+            for other_id, _, _ in switch_edges:
+                if node_types.get(other_id) == 'switch_core':
+                    other_node = node_map[other_id]
                     # Buscar la IP de VLAN 1 del switch core en sus VLANs asignadas
                     # Por convención, el switch core tiene VLAN 1 configurada
                     # El gateway será base_octet.0.{vlan_number}.254
                     # Por ahora usar un patrón: cada switch core tendrá su propia red para VLAN 1
                     # SW conectado a SWC1 = 15.0.1.x, SW conectado a SWC2 = 15.0.2.x, etc.
                     swc_index = switch_cores.index(other_node) + 1
-                    config_lines.append(f"ip default-Gateway 192.168.{swc_index}.254")
-                    config_lines.append("interface vlan 1")
-                    config_lines.append(f"ip address 192.168.{swc_index}.{9 + switch_number} 255.255.255.0")
-                    config_lines.append(" no shut")
-                    config_lines.append("exit")
-                    config_lines.append("")
+                    config_lines.extend((
+                        f"ip default-Gateway 192.168.{swc_index}.254",
+                        "interface vlan 1",
+                        f"ip address 192.168.{swc_index}.{9 + switch_number} 255.255.255.0",
+                        " no shut",
+                        "exit",
+                        "",
+                    ))
                     connected_swc_vlan1_ip = f"192.168.{swc_index}.254"
                     break
             
             # Si no encontró switch core, usar patrón por defecto
             if not connected_swc_vlan1_ip:
-                config_lines.append(f"ip default-Gateway 192.168.1.254")
-                config_lines.append("interface vlan 1")
-                config_lines.append(f"ip address 192.168.1.{9 + switch_number} 255.255.255.0")
-                config_lines.append(" no shut")
-                config_lines.append("exit")
-                config_lines.append("")
+                config_lines.extend((
+                    f"ip default-Gateway 192.168.1.254",
+                    "interface vlan 1",
+                    f"ip address 192.168.1.{9 + switch_number} 255.255.255.0",
+                    " no shut",
+                    "exit",
+                    "",
+                ))
             config_lines.append("")
             
             # Obtener edges del switch
@@ -960,23 +983,20 @@ def handle_visual_topology(topology):
             computer_ports = []
             
             # Procesar computadoras del antiguo sistema (nodos computer conectados)
-            for edge in switch_edges:
-                other_id = edge['to'] if edge['from'] == switch_id else edge['from']
-                other_node = node_map.get(other_id)
-                
-                if other_node and other_node['data']['type'] == 'computer':
-                    vlan_name = other_node['data'].get('vlan')
+            for other_id, edge, is_from in switch_edges:
+                if node_types.get(other_id) == 'computer':
+                    other_data = node_map[other_id]['data']
+                    vlan_name = other_data.get('vlan')
                     if vlan_name:
-                        vlan_num = ''.join(filter(str.isdigit, vlan_name))
+                        vlan_num = _vlan_number(vlan_name, vlan_num_map)
                         if vlan_num:
-                            is_from = edge['from'] == switch_id
                             iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
                             iface_full = f"{iface_data['type']}{iface_data['number']}"
                             
                             computer_ports.append({
                                 'interface': iface_full,
                                 'vlan': vlan_num,
-                                'computer': other_node['data']['name']
+                                'computer': other_data['name']
                             })
             
             # Procesar computadoras del nuevo sistema (almacenadas en el switch)
@@ -984,7 +1004,7 @@ def handle_visual_topology(topology):
                 for pc in switch['data']['computers']:
                     vlan_name = pc.get('vlan')
                     if vlan_name:
-                        vlan_num = ''.join(filter(str.isdigit, vlan_name))
+                        vlan_num = _vlan_number(vlan_name, vlan_num_map)
                         if vlan_num:
                             # El puerto ya viene completo: "FastEthernet0/1" o "GigabitEthernet1/0/1"
                             port_full = pc.get('portNumber', '')
@@ -996,11 +1016,7 @@ def handle_visual_topology(topology):
             
             # ✅ CREAR TODAS LAS VLANs GLOBALES (no solo las que tienen PCs)
             # Esto garantiza que el trunk funcione correctamente entre switches
-            for vlan in vlans:
-                vlan_num = ''.join(filter(str.isdigit, vlan['name']))
-                if vlan_num:
-                    config_lines.append(f"vlan {vlan_num}")
-                    config_lines.append(f" name {vlan['name'].lower()}")
+            config_lines.extend(sw_vlan_declarations)
             
             # Agregar exit después de crear VLANs
             if vlans:
@@ -1013,28 +1029,27 @@ def handle_visual_topology(topology):
             
             # Configurar puerto trunk hacia switch core, router u otro switch
             etherchannel_configs = []
-            processed_edges = set()  # Para evitar procesar el mismo edge dos veces
             
-            for edge in switch_edges:
-                # Evitar procesar el mismo edge dos veces (cuando hay switch-to-switch)
-                if edge['id'] in processed_edges:
-                    continue
-                    
-                other_id = edge['to'] if edge['from'] == switch['id'] else edge['from']
-                other_node = next((n for n in nodes if n['id'] == other_id), None)
+            # Cada edge una sola vez: agrupar por id (un edge switch-to-switch
+            # del mismo switch aparece dos veces en edges_by_node); se conserva
+            # la primera aparición
+            unique_edges = {}
+            for entry in switch_edges:
+                unique_edges.setdefault(entry[1]['id'], entry)
+            
+            for other_id, edge, is_from in unique_edges.values():
+                # Tipo en un solo acceso; las PCs sintéticas no están en node_types y se ignoran igual
+                other_type = node_types.get(other_id)
                 
                 # Aceptar conexiones a switch_core, router, switch u wlc
-                if other_node and other_node['data']['type'] in ['switch_core', 'router', 'switch', 'wlc', 'ap']:
-                    is_from = edge['from'] == switch['id']
-                    
+                if other_type in ('switch_core', 'router', 'switch', 'wlc', 'ap'):
                     # Verificar si es EtherChannel
                     if 'etherChannel' in edge['data']:
                         etherchannel_configs.append({
                             'data': edge['data']['etherChannel'],
                             'is_from': is_from,
-                            'target': other_node['data']['name']
+                            'target': node_map[other_id]['data']['name']
                         })
-                        processed_edges.add(edge['id'])  # Marcar como procesado
                     else:
                         # Configuración normal de trunk
                         iface_data = edge['data']['fromInterface'] if is_from else edge['data']['toInterface']
@@ -1044,12 +1059,11 @@ def handle_visual_topology(topology):
                         config_lines.append("switchport mode trunk")
                         
                         # Si es WLC, AP o Switch Core y hay VLAN nativa, configurar native vlan
-                        if other_node['data']['type'] in ['wlc', 'ap', 'switch_core'] and native_vlan_id:
+                        if other_type in ('wlc', 'ap', 'switch_core') and native_vlan_id:
                             config_lines.append(f"switchport trunk native vlan {native_vlan_id}")
                         
                         config_lines.append("no shut")
                         config_lines.append("")
-                        processed_edges.add(edge['id'])  # Marcar como procesado
             
             # Configurar EtherChannels si existen
             for ec_config in etherchannel_configs:
@@ -1058,9 +1072,11 @@ def handle_visual_topology(topology):
             
             # Configurar puertos de acceso para computadoras
             for port in computer_ports:
-                config_lines.append(f"int {port['interface']}")
-                config_lines.append(f"switchport access vlan {port['vlan']}")
-                config_lines.append(" no shut")
+                config_lines.extend((
+                    f"int {port['interface']}",
+                    f"switchport access vlan {port['vlan']}",
+                    " no shut",
+                ))
             
             router_configs.append({
                 'name': name,
@@ -1072,51 +1088,57 @@ def handle_visual_topology(topology):
             })
         
         # Generar resumen de VLANs
+        # Índice VLAN → nombres de PCs en una sola pasada (evita recorrer computers por VLAN)
+        computers_by_vlan = defaultdict(list)
+        for c in computers:
+            computers_by_vlan[c['data'].get('vlan')].append(c['data']['name'])
+        
         vlan_summary = []
         for vlan in vlans:
-            vlan_num = ''.join(filter(str.isdigit, vlan['name']))
-            computers_in_vlan = [c for c in computers if c['data'].get('vlan') == vlan['name']]
+            vlan_num = vlan_num_map[vlan['name']]
+            computers_in_vlan = computers_by_vlan.get(vlan['name'], [])
             
             vlan_summary.append({
                 'name': vlan['name'],
                 'vlan_id': vlan_num,
                 'prefix': f"/{vlan['prefix']}",
                 'computers_count': len(computers_in_vlan),
-                'computers': [c['data']['name'] for c in computers_in_vlan]
+                'computers': list(computers_in_vlan)
             })
         
-        # Generar rutas estáticas
-        routing_tables = generate_routing_table(router_configs)
+        # Generar rutas estáticas (sin enlaces backbone no hay next-hops posibles)
+        routing_tables = generate_routing_table(router_configs) if edge_ips else {}
         
         for router in router_configs:
-            router_name = router['name']
-            if router_name in routing_tables:
-                routes = routing_tables[router_name]['routes']
-                route_commands = generate_static_routes_commands(routes)
-                
-                if route_commands:
-                    # Agregar rutas al final de la configuración
-                    config = router['config']
-                    
-                    # Verificar si la última línea no vacía es 'exit'
-                    # Si ya existe exit, no agregarlo nuevamente
-                    last_non_empty = None
-                    for line in reversed(config):
-                        if line.strip():
-                            last_non_empty = line.strip().lower()
-                            break
-                    
-                    # Si route_commands comienza con 'exit' y config ya termina con 'exit',
-                    # eliminar el exit de route_commands para evitar duplicación
-                    if last_non_empty == 'exit' and route_commands[0].strip().lower() == 'exit':
-                        route_commands = route_commands[1:]  # Eliminar el primer exit
-                    
-                    config = config + [""] + route_commands
-                    router['config'] = config
-                    router['routes'] = routes
+            entry = routing_tables.get(router['name'])
+            if not entry or not entry['routes']:
+                continue
+            
+            routes = entry['routes']
+            route_commands = generate_static_routes_commands(routes)
+            
+            # Agregar rutas al final de la configuración
+            config = router['config']
+            
+            # Verificar si la última línea no vacía es 'exit'
+            # Si ya existe exit, no agregarlo nuevamente
+            last_non_empty = None
+            for line in reversed(config):
+                if line.strip():
+                    last_non_empty = line.strip().lower()
+                    break
+            
+            # Si route_commands comienza con 'exit' y config ya termina con 'exit',
+            # eliminar el exit de route_commands para evitar duplicación
+            if last_non_empty == 'exit' and route_commands[0].strip().lower() == 'exit':
+                route_commands = route_commands[1:]  # Eliminar el primer exit
+            
+            # Extender en sitio: config_lines pertenece solo a este dispositivo
+            config.append("")
+            config.extend(route_commands)
+            router['routes'] = routes
         
         # Generar contenido de archivos TXT separados por tipo (en memoria, no en disco)
-        global config_files_content
         config_files_content = generate_separated_txt_files(router_configs)
         
         # Solo generar script PTBuilder si NO es modo físico
@@ -1124,8 +1146,9 @@ def handle_visual_topology(topology):
             ptbuilder_content = generate_ptbuilder_script(topology, router_configs, computers, servers)
             config_files_content['ptbuilder'] = ptbuilder_content
         
-        # Transferir al config de Flask para que las rutas de descarga puedan acceder
-        current_app.config['CONFIG_FILES_CONTENT'] = config_files_content
+        # Guardar en el almacén por sesión para que las rutas de descarga accedan
+        # a los archivos de ESTA generación (no a los del último usuario)
+        session['config_key'] = current_app.config['CONFIG_STORE'].put(config_files_content)
         
         return render_template("success.html", 
                              routers=router_configs,
@@ -1133,7 +1156,11 @@ def handle_visual_topology(topology):
                              is_physical_mode=is_physical_mode)
     
     except Exception as e:
-        import traceback
-        error_detail = traceback.format_exc()
-        return f"Error procesando topología: {str(e)}<br><pre>{error_detail}</pre>", 400
+        # Traza completa solo al log (una vez); la respuesta es un JSON compacto.
+        # La traza se incluye en la respuesta únicamente en modo debug.
+        current_app.logger.exception("Error procesando topología")
+        error = {'error': f"Error procesando topología: {e}"}
+        if current_app.debug:
+            error['trace'] = traceback.format_exc()
+        return jsonify(error), 400
 
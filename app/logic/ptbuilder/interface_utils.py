@@ -3,6 +3,19 @@ MÓDULO: interface_utils.py
 DESCRIPCIÓN: Utilidades para transformación de interfaces y coordenadas para PT Builder
 """
 
+# Comandos que indican que la configuración ya entra en modo configuración
+_CONFIG_MODE_COMMANDS = frozenset({'enable', 'config terminal', 'configure terminal', 'conf t'})
+
+# Tipo de interfaz (corto o completo) → nombre completo para PT Builder
+_INTERFACE_TYPE_MAP = {
+    'fa': 'FastEthernet',
+    'gi': 'GigabitEthernet',
+    'eth': 'Ethernet',
+    'FastEthernet': 'FastEthernet',
+    'GigabitEthernet': 'GigabitEthernet',
+    'Ethernet': 'Ethernet'
+}
+
 
 def transform_coordinates_to_ptbuilder(nodes, scale_factor=1.0):
     """
@@ -43,21 +56,18 @@ def transform_coordinates_to_ptbuilder(nodes, scale_factor=1.0):
     topology_center_y = (y_min + y_max) / 2
     
     # Transformar cada nodo: centrar y aplicar escala
+    # (reutiliza las coordenadas ya leídas en lugar de volver a consultar cada nodo)
     transformed = {}
-    for node in nodes:
-        node_id = node.get('id')
-        x_orig = node.get('x', 0)
-        y_orig = node.get('y', 0)
-        
+    for node, x_orig, y_orig in zip(nodes, x_coords, y_coords):
         # Desplazar al origen (restar el centro)
         x_relative = (x_orig - topology_center_x) * scale_factor
         y_relative = (y_orig - topology_center_y) * scale_factor
         
         # Mover al centro de Packet Tracer
-        x_pt = int(PT_CENTER_X + x_relative)
-        y_pt = int(PT_CENTER_Y + y_relative)
-        
-        transformed[node_id] = {'x': x_pt, 'y': y_pt}
+        transformed[node.get('id')] = {
+            'x': int(PT_CENTER_X + x_relative),
+            'y': int(PT_CENTER_Y + y_relative)
+        }
     
     return transformed
 
@@ -83,12 +93,10 @@ def format_config_for_ptbuilder(config_lines):
     
     # Detectar si la configuración ya comienza con enable + config terminal
     # En ese caso, ya estamos en modo configuración y NO debemos agregar exit\nenable\nconf t
-    starts_with_config_mode = False
-    for i, line in enumerate(config_lines[:5]):  # Revisar las primeras 5 líneas
-        line_lower = line.strip().lower()
-        if line_lower in ['enable', 'config terminal', 'configure terminal', 'conf t']:
-            starts_with_config_mode = True
-            break
+    starts_with_config_mode = any(
+        line.strip().lower() in _CONFIG_MODE_COMMANDS
+        for line in config_lines[:5]  # Revisar las primeras 5 líneas
+    )
     
     formatted = []
     found_first_interface = False
@@ -97,12 +105,9 @@ def format_config_for_ptbuilder(config_lines):
     last_was_exit = False  # Rastrear si el último comando fue exit
     in_config_mode = starts_with_config_mode  # Rastrear si estamos en modo config
     
-    # Pre-analizar para detectar si hay ip route después de un exit
-    has_ip_route = any(line.strip().lower().startswith('ip route') for line in config_lines)
-    
-    for i, line in enumerate(config_lines):
-        line_stripped = line.strip()
-        line_lower = line_stripped.lower()
+    # Una sola pasada: cada línea se normaliza (strip + lower) una única vez
+    for line in config_lines:
+        line_lower = line.strip().lower()
         
         # Detectar ip dhcp excluded-address
         if line_lower.startswith('ip dhcp excluded-address'):
@@ -146,7 +151,7 @@ def format_config_for_ptbuilder(config_lines):
             last_was_exit = False
 
         # Detectar inicio de configuración de interfaz
-        elif line_lower.startswith('int ') or line_lower.startswith('interface '):
+        elif line_lower.startswith(('int ', 'interface ')):
             # Si salimos de un pool DHCP, agregar exit\nenable\nconf t
             if inside_dhcp_pool:
                 formatted.append('exit')
@@ -182,7 +187,7 @@ def format_config_for_ptbuilder(config_lines):
             last_was_exit = False
             
         # Detectar comandos de routing que van después de todas las interfaces
-        elif line_lower.startswith('ip route') or line_lower.startswith('ipv6 route'):
+        elif line_lower.startswith(('ip route', 'ipv6 route')):
             # Si salimos de un pool DHCP, agregar exit\nenable\nconf t
             if inside_dhcp_pool:
                 formatted.append('exit')
@@ -236,15 +241,7 @@ def expand_interface_type(short_type):
     Returns:
         str: Nombre completo de interfaz ('FastEthernet', 'GigabitEthernet', 'Ethernet')
     """
-    interface_map = {
-        'fa': 'FastEthernet',
-        'gi': 'GigabitEthernet',
-        'eth': 'Ethernet',
-        'FastEthernet': 'FastEthernet',
-        'GigabitEthernet': 'GigabitEthernet',
-        'Ethernet': 'Ethernet'
-    }
-    return interface_map.get(short_type, short_type)
+    return _INTERFACE_TYPE_MAP.get(short_type, short_type)
 
 
 
@@ -3,6 +3,8 @@ MÓDULO: ptbuilder.py
 DESCRIPCIÓN: Generador de scripts para Packet Tracer Builder
 """
 
+from flask import current_app
+
 from app.logic.ptbuilder.interface_utils import transform_coordinates_to_ptbuilder, expand_interface_range, format_config_for_ptbuilder
 
 
@@ -74,16 +76,6 @@ def generate_ptbuilder_script(topology, router_configs, computers, servers=[]):
     # Transformar coordenadas de vis.network a Packet Tracer
     coordinate_transform = transform_coordinates_to_ptbuilder(nodes)
     
-    # DEBUG: Mostrar coordenadas transformadas
-    print("\n🔄 COORDENADAS TRANSFORMADAS AL RANGO DE PACKET TRACER:")
-    for node in nodes:
-        node_id = node.get('id')
-        if node_id in coordinate_transform:
-            original_x = node.get('x')
-            original_y = node.get('y')
-            transformed = coordinate_transform[node_id]
-            print(f"  {node['data']['name']}: ({original_x}, {original_y}) → ({transformed['x']}, {transformed['y']})")
-    
     for node in nodes:
         device_name = node['data']['name']
         device_type = node['data']['type']
@@ -127,12 +119,6 @@ def generate_ptbuilder_script(topology, router_configs, computers, servers=[]):
             # Es un EtherChannel - generar múltiples cables físicos
             ec_data = edge['data']['etherChannel']
             
-            print(f"\n🔗 ETHERCHANNEL: {from_name} → {to_name}")
-            print(f"   Protocolo: {ec_data.get('protocol', 'N/A')}")
-            print(f"   Grupo: {ec_data.get('group', 'N/A')}")
-            print(f"   From Range: {ec_data.get('fromType', 'N/A')} {ec_data.get('fromRange', 'N/A')}")
-            print(f"   To Range: {ec_data.get('toType', 'N/A')} {ec_data.get('toRange', 'N/A')}")
-            
             # Expandir rangos de interfaces
             from_interfaces = expand_interface_range(
                 ec_data.get('fromType', 'fa'), 
@@ -143,43 +129,28 @@ def generate_ptbuilder_script(topology, router_configs, computers, servers=[]):
                 ec_data.get('toRange', '0/1')
             )
             
-            print(f"   Interfaces expandidas FROM: {from_interfaces}")
-            print(f"   Interfaces expandidas TO: {to_interfaces}")
-            
             # Determinar tipo de cable según dispositivos
             cable_type = get_cable_type(from_node['data']['type'], to_node['data']['type'])
             
             # Generar un addLink por cada par de interfaces del bundle
             for from_if, to_if in zip(from_interfaces, to_interfaces):
                 lines.append(f'addLink("{from_name}", "{from_if}", "{to_name}", "{to_if}", "{cable_type}");')
-                print(f"   ✅ Cable generado ({cable_type}): {from_if} ↔ {to_if}")
         
         # Conexión normal (no es EtherChannel)
         elif 'data' in edge and 'fromInterface' in edge['data'] and 'toInterface' in edge['data']:
             from_iface_data = edge['data']['fromInterface']
             to_iface_data = edge['data']['toInterface']
             
-            # DEBUG: Mostrar datos separados antes de construir nombre completo
-            print(f"\n🔗 CONEXIÓN NORMAL: {from_name} → {to_name}")
-            print(f"   Edge ID: {edge.get('id')}")
-            print(f"   Edge Data completo: {edge['data']}")
-           
-            
             # Construir nombre completo de interfaz
             from_iface = f"{from_iface_data['type']}{from_iface_data['number']}"
             to_iface = f"{to_iface_data['type']}{to_iface_data['number']}"
             
-            # DEBUG: Mostrar interfaces construidas
-            print(f"   From Interface construida: {from_iface}")
-            print(f"   To Interface construida: {to_iface}")
-            
             # Determinar tipo de cable según dispositivos conectados
             cable_type = get_cable_type(from_node['data']['type'], to_node['data']['type'])
-            print(f"   Tipo de cable: {cable_type} ({from_node['data']['type']} → {to_node['data']['type']})")
             
             lines.append(f'addLink("{from_name}", "{from_iface}", "{to_name}", "{to_iface}", "{cable_type}");')
         else:
-            print(f"⚠️ Advertencia: Conexión sin interfaces definidas entre {from_name} y {to_name}")
+            current_app.logger.warning("Conexión sin interfaces definidas entre %s y %s", from_name, to_name)
     
     lines.append("")
     # Generar configuraciones para cada dispositivo (routers, switches, switch cores)
@@ -6,6 +6,8 @@ DESCRIPCIÓN: Algoritmo BFS para generación de tablas de ruteo estático
 import ipaddress
 from collections import deque
 
+from app.logic.network_calculations.subnetting import first_last_host
+
 
 def generate_routing_table(all_routers: list) -> dict:
     """
@@ -66,25 +68,34 @@ def generate_routing_table(all_routers: list) -> dict:
             R2: ip route 192.168.10.0 255.255.255.0 19.0.0.1
     
     Optimizaciones implementadas:
-        - router_map: Búsqueda O(1) en lugar de O(n) por nombre
         - router_networks: Pre-calcula redes conocidas (evita calcular en cada iteración)
+        - router_announced: redes anunciadas convertidas a str una sola vez
+          por router, no en cada visita del BFS
+        - local_ifaces: interfaz de salida por vecino (dict en lugar de
+          recorrer backbone_interfaces en cada vecino descubierto)
+        - deque como cola del BFS (popleft O(1) en lugar de list.pop(0))
         - net_to_router_map: Mapeo directo red → router propietario
         - BFS direccional: Solo explora caminos válidos hacia adelante
     """
     routing_tables = {}
     
-    # Pre-calcular mapas para búsquedas O(1)
-    router_map = {r['name']: r for r in all_routers}
-    
-    # Pre-calcular todas las redes conocidas por cada router
+    # Pre-calcular las redes de cada router una sola vez:
+    #   - router_announced: (red, tipo, nombre) en el orden en que se anuncian a los vecinos
+    #   - router_networks: set de redes conocidas (redes directamente conectadas)
+    router_announced = {}
     router_networks = {}
     for router in all_routers:
-        known = set()
+        router_name = router['name']
+        announced = []
         for vlan in router.get('vlans', []):
-            known.add(str(vlan['network']))
+            announced.append((str(vlan['network']), 'VLAN', vlan.get('name', 'Unknown')))
         for backbone in router.get('backbone_interfaces', []):
-            known.add(str(backbone['network']))
-        router_networks[router['name']] = known
+            announced.append((
+                str(backbone['network']), 'BACKBONE',
+                f"Backbone-{router_name}-{backbone['target']}"
+            ))
+        router_announced[router_name] = announced
+        router_networks[router_name] = {net_str for net_str, _, _ in announced}
     
     # Construir grafo direccional de conexiones permitidas (con cache)
     allowed_connections = {r['name']: {} for r in all_routers}
@@ -98,14 +109,14 @@ def generate_routing_table(all_routers: list) -> dict:
             direction = backbone.get('routing_direction', 'bidirectional')
             is_from = backbone.get('is_from', True)
             
-            # Cache: pre-calcular next-hop
+            # Cache: pre-calcular next-hop (primer host distinto de my_ip,
+            # sin recorrer hosts(): en una /30 es el otro extremo del enlace)
             next_hop_ip = None
-            my_ip_str = str(my_ip)
-            for ip in network.hosts():
-                ip_str = str(ip)
-                if ip_str != my_ip_str:
-                    next_hop_ip = ip_str
-                    break
+            first, last = first_last_host(network)
+            if str(first) != str(my_ip):
+                next_hop_ip = str(first)
+            elif first != last:
+                next_hop_ip = str(first + 1)
             
             if not next_hop_ip:
                 continue
@@ -125,13 +136,21 @@ def generate_routing_table(all_routers: list) -> dict:
         router_name = router['name']
         known_networks = router_networks[router_name]
         
-        # BFS con early termination
+        # Interfaz local hacia cada vecino directo (primera coincidencia)
+        local_ifaces = {}
+        for backbone in router.get('backbone_interfaces', []):
+            local_ifaces.setdefault(
+                backbone['target'],
+                backbone.get('full_name', backbone.get('name', 'unknown'))
+            )
+        
+        # BFS con early termination (deque: popleft O(1))
         reachable_networks = {}
         visited = {router_name}
-        queue = [(router_name, None, None)]
+        queue = deque([(router_name, None, None)])
         
         while queue:
-            current, first_hop_ip, first_hop_iface = queue.pop(0)
+            current, first_hop_ip, first_hop_iface = queue.popleft()
             
             # Explorar vecinos (ya pre-calculados)
             for neighbor, next_hop in allowed_connections.get(current, {}).items():
@@ -142,35 +161,17 @@ def generate_routing_table(all_routers: list) -> dict:
                 
                 # Primer salto
                 actual_hop_ip = first_hop_ip or next_hop
-                actual_hop_iface = first_hop_iface
-                
-                if not actual_hop_iface:
-                    for backbone in router.get('backbone_interfaces', []):
-                        if backbone['target'] == neighbor:
-                            actual_hop_iface = backbone.get('full_name', backbone.get('name', 'unknown'))
-                            break
+                actual_hop_iface = first_hop_iface or local_ifaces.get(neighbor)
                 
                 via_router = neighbor if first_hop_ip else None
-                neighbor_router = router_map.get(neighbor)
                 
-                if neighbor_router:
-                    # VLANs del vecino
-                    for vlan in neighbor_router.get('vlans', []):
-                        net_str = str(vlan['network'])
-                        if net_str not in known_networks and net_str not in reachable_networks:
-                            reachable_networks[net_str] = (
-                                actual_hop_ip, actual_hop_iface, neighbor,
-                                via_router, 'VLAN', vlan.get('name', 'Unknown')
-                            )
-                    
-                    # Backbones del vecino
-                    for backbone in neighbor_router.get('backbone_interfaces', []):
-                        net_str = str(backbone['network'])
-                        if net_str not in known_networks and net_str not in reachable_networks:
-                            reachable_networks[net_str] = (
-                                actual_hop_ip, actual_hop_iface, neighbor,
-                                via_router, 'BACKBONE', f"Backbone-{neighbor}-{backbone['target']}"
-                            )
+                # VLANs y backbones del vecino (pre-calculados)
+                for net_str, net_type, net_name in router_announced.get(neighbor, ()):
+                    if net_str not in known_networks and net_str not in reachable_networks:
+                        reachable_networks[net_str] = (
+                            actual_hop_ip, actual_hop_iface, neighbor,
+                            via_router, net_type, net_name
+                        )
                 
                 queue.append((neighbor, actual_hop_ip, actual_hop_iface))
         
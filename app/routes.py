@@ -2,8 +2,9 @@
 Rutas HTTP de la aplicación
 """
 
-from flask import Blueprint, render_template, request, send_file, current_app
-import json
+from flask import Blueprint, render_template, request, send_file, current_app, session
+import gzip
+import hashlib
 import io
 
 # Importar funciones del orquestador
@@ -11,18 +12,98 @@ from app.logic.orchestrator import handle_visual_topology
 
 bp = Blueprint('main', __name__)
 
+# Tipo de archivo descargable → nombre de descarga (constante de módulo)
+_DOWNLOAD_NAMES = {
+    'routers': 'config_routers.txt',
+    'switch_cores': 'config_switch_cores.txt',
+    'switches': 'config_switches.txt',
+    'completo': 'config_completo.txt',
+    'ptbuilder': 'topology_ptbuilder.txt',
+    'wlan': 'WLAN_config.txt'
+}
+
+
+def _generated_files():
+    """
+    Entrada del almacén con los archivos generados por esta sesión
+    
+    Returns:
+        dict | None: {'files': ..., 'downloads': ...} o None si la sesión
+        no generó una topología (o su generación ya fue descartada)
+    """
+    return current_app.config['CONFIG_STORE'].get(session.get('config_key'))
+
+
+def _send_config_file(entry, key, download_name):
+    """
+    Envía un archivo de configuración desde memoria con soporte condicional
+    
+    Los bytes y el ETag se calculan una sola vez por archivo generado y se
+    guardan en la propia entrada del almacén. Si el navegador acepta gzip,
+    se envía la versión comprimida (también calculada una sola vez, la
+    primera vez que se pide). Con conditional=True, una petición con
+    If-None-Match que coincide recibe 304 sin cuerpo.
+    
+    Args:
+        entry (dict): Entrada del almacén devuelta por _generated_files()
+        key (str): Tipo de archivo dentro de entry['files']
+        download_name (str): Nombre con el que se descarga
+    """
+    cached = entry['downloads'].get(key)
+    if cached is None:
+        data = entry['files'][key].encode('utf-8')
+        cached = {
+            'data': data,
+            'etag': hashlib.sha1(data).hexdigest(),
+            'gzip': None
+        }
+        entry['downloads'][key] = cached
+    
+    use_gzip = 'gzip' in request.accept_encodings
+    if use_gzip:
+        if cached['gzip'] is None:
+            # mtime=0: misma salida para el mismo contenido
+            cached['gzip'] = gzip.compress(cached['data'], compresslevel=6, mtime=0)
+        body, etag = cached['gzip'], cached['etag'] + '-gz'
+    else:
+        body, etag = cached['data'], cached['etag']
+    
+    response = send_file(
+        io.BytesIO(body),
+        mimetype='text/plain',
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        etag=etag
+    )
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @bp.route("/", methods=["GET", "POST"])
 def index():
     """
     Ruta principal de la aplicación
     
     GET: Muestra el diseñador visual de topología
-    POST: Procesa la topología diseñada y genera configuraciones
+    POST: Procesa la topología diseñada y genera configuraciones.
+          Acepta el campo de formulario topology_data (diseñador, nueva
+          pestaña) o un cuerpo application/json.
     """
     if request.method == "POST":
+        if request.is_json:
+            # Cuerpo JSON: se parsea directamente desde los bytes, sin
+            # decodificar formulario (MAX_CONTENT_LENGTH ya limita el tamaño → 413)
+            topology = request.get_json(silent=True, cache=False)
+            if topology:
+                return handle_visual_topology(topology)
+            return "No se recibieron datos de topología", 400
+        
         topology_data = request.form.get("topology_data")
         if topology_data:
-            topology = json.loads(topology_data)
+            # app.json usa orjson cuando está instalado (ver create_app)
+            topology = current_app.json.loads(topology_data)
             return handle_visual_topology(topology)
         else:
             return "No se recibieron datos de topología", 400
@@ -46,21 +127,12 @@ def download():
     """
     Descarga el archivo de configuración completo
     """
-    config_files = current_app.config.get('CONFIG_FILES_CONTENT', {})
+    entry = _generated_files()
     
-    if 'completo' not in config_files:
+    if entry is None or 'completo' not in entry['files']:
         return "No hay configuraciones generadas. Genera una topología primero.", 400
     
-    file_content = config_files['completo']
-    file_bytes = io.BytesIO(file_content.encode('utf-8'))
-    file_bytes.seek(0)
-    
-    return send_file(
-        file_bytes,
-        mimetype='text/plain',
-        as_attachment=True,
-        download_name='config_completo.txt'
-    )
+    return _send_config_file(entry, 'completo', 'config_completo.txt')
 
 
 @bp.route("/download/<device_type>")
@@ -71,30 +143,11 @@ def download_by_type(device_type):
     Args:
         device_type: routers, switch_cores, switches, completo, ptbuilder
     """
-    config_files = current_app.config.get('CONFIG_FILES_CONTENT', {})
-    
-    file_names = {
-        'routers': 'config_routers.txt',
-        'switch_cores': 'config_switch_cores.txt',
-        'switches': 'config_switches.txt',
-        'completo': 'config_completo.txt',
-        'ptbuilder': 'topology_ptbuilder.txt',
-        'wlan': 'WLAN_config.txt'
-    }
-    
-    if device_type not in file_names:
+    if device_type not in _DOWNLOAD_NAMES:
         return "Tipo de dispositivo no válido.", 400
     
-    if device_type not in config_files:
+    entry = _generated_files()
+    if entry is None or device_type not in entry['files']:
         return f"No hay configuraciones de tipo '{device_type}' generadas.", 400
     
-    file_content = config_files[device_type]
-    file_bytes = io.BytesIO(file_content.encode('utf-8'))
-    file_bytes.seek(0)
-    
-    return send_file(
-        file_bytes,
-        mimetype='text/plain',
-        as_attachment=True,
-        download_name=file_names[device_type]
-    )
\ No newline at end of file
+    return _send_config_file(entry, device_type, _DOWNLOAD_NAMES[device_type])
\ No newline at end of file
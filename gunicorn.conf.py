@@ -0,0 +1,33 @@
+"""
+MÓDULO: gunicorn.conf.py
+DESCRIPCIÓN: Configuración de gunicorn para producción (gunicorn run:app)
+
+gunicorn carga este archivo automáticamente desde el directorio de trabajo,
+así que el startCommand de render.yaml no necesita cambios.
+
+El procesamiento de una topología es Python puro y retiene el GIL, por lo
+que el paralelismo real entre peticiones viene de procesos (workers), no de
+hilos. Sin embargo, las configuraciones generadas se guardan en memoria del
+proceso (app.config['CONFIG_STORE']): con varios workers, la descarga
+puede llegar a un proceso distinto del que generó la topología.
+Por eso el valor por defecto es 1 worker; WEB_CONCURRENCY permite subirlo
+cuando el almacenamiento de descargas sea compartido.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Procesos: paralelismo real para peticiones CPU-bound
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Hilos por worker: las descargas y los GET no esperan a que termine
+# una generación en curso
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Cargar la app antes de hacer fork: los módulos y constantes de solo
+# lectura se comparten entre workers (copy-on-write)
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
@@ -0,0 +1,33 @@
+"""
+Pruebas del almacén de archivos generados por sesión (ConfigStore)
+"""
+import json
+
+from app import create_app
+from app.core.config_store import ConfigStore
+
+
+def test_config_store_evicts_least_recently_used():
+    store = ConfigStore(max_entries=2)
+    first = store.put({'completo': 'a'})
+    second = store.put({'completo': 'b'})
+    assert store.get(first)['files'] == {'completo': 'a'}  # first pasa a ser el más reciente
+    third = store.put({'completo': 'c'})
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+    assert len(store) == 2
+
+
+def test_downloads_are_scoped_to_the_generating_session():
+    app = create_app()
+    topology = {
+        'nodes': [{'id': 'r1', 'data': {'type': 'router', 'name': 'R1'}}],
+        'edges': [],
+        'vlans': []
+    }
+    with app.test_client() as owner, app.test_client() as other:
+        assert owner.post('/', data={'topology_data': json.dumps(topology)}).status_code == 200
+        response = owner.get('/download/routers')
+        assert response.status_code == 200
+        assert 'ROUTER: R1' in response.get_data(as_text=True)
+        assert other.get('/download/routers').status_code == 400
@@ -0,0 +1,17 @@
+"""
+Pruebas del orquestador de generación de configuraciones
+"""
+from app import create_app
+
+
+def test_unused_vlan_prefix_is_not_parsed():
+    # Sin routers ni switch cores, el prefijo de la VLAN no se usa:
+    # no debe validarse (ni rechazar la topología) al inicio
+    app = create_app()
+    topology = {
+        'nodes': [{'id': 'sw1', 'data': {'type': 'switch', 'name': 'SW1'}}],
+        'edges': [],
+        'vlans': [{'name': 'V10', 'prefix': ''}]
+    }
+    with app.test_client() as client:
+        assert client.post('/', json=topology).status_code == 200
@@ -131,7 +131,10 @@ def test_performance():
     print(f"   - {len(topology['vlans'])} VLANs")
     
     # Importar función
-    from app import handle_visual_topology
+    from app import create_app
+    from app.logic.orchestrator import handle_visual_topology
+    
+    app = create_app()
     
     print("\n⏱️  Midiendo rendimiento...")
     
@@ -139,7 +142,8 @@ def test_performance():
     times = []
     for run in range(1, 4):
         start = time.time()
-        result = handle_visual_topology(topology)
+        with app.test_request_context('/'):
+            result = handle_visual_topology(topology)
         elapsed = time.time() - start
         times.append(elapsed)
         print(f"   Run {run}: {elapsed:.3f}s")
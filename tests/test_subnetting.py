@@ -0,0 +1,95 @@
+"""
+Pruebas del asignador de subredes (generate_blocks / UsedRanges)
+"""
+import ipaddress
+import random
+
+from app.logic.network_calculations.subnetting import generate_blocks, generate_blocks_batch, UsedRanges, first_last_host
+
+
+def _generate_blocks_reference(base_net, prefix, count, used, skip_first=False):
+    """Versión lineal original: recorre todas las subredes y compara contra cada red usada"""
+    results = []
+    for idx, cand in enumerate(base_net.subnets(new_prefix=prefix)):
+        if idx < (1 if skip_first else 0):
+            continue
+        if not any(cand.overlaps(net) for net in used):
+            results.append(cand)
+            used.append(cand)
+            if len(results) == count:
+                break
+    return results
+
+
+def _random_case(seed, base_net, prefix_choices, count, reserved_count):
+    """Prefijos aleatorios y redes /30 ya reservadas dentro de base_net (reproducible por semilla)"""
+    rng = random.Random(seed)
+    base_int = int(base_net.network_address)
+    reserved = [ipaddress.ip_network((base_int + rng.randrange(0, base_net.num_addresses, 4), 30))
+                for _ in range(reserved_count)]
+    prefixes = [rng.choice(prefix_choices) for _ in range(count)]
+    return reserved, prefixes
+
+
+def _one_at_a_time(base_net, prefixes, used, skip_first_prefix=None, allocate=generate_blocks):
+    """Asigna un bloque por prefijo con una llamada cada vez (None si ya no hay espacio)"""
+    return [(allocate(base_net, p, 1, used, skip_first=p == skip_first_prefix) or [None])[0]
+            for p in prefixes]
+
+
+def test_generate_blocks_docstring_example():
+    base = ipaddress.ip_network('192.168.0.0/16')
+    used = UsedRanges()
+    subnets = generate_blocks(base, 24, 3, used)
+    assert [str(s) for s in subnets] == ['192.168.0.0/24', '192.168.1.0/24', '192.168.2.0/24']
+    assert len(used) == 1
+
+
+def test_generate_blocks_matches_reference_allocation():
+    base = ipaddress.ip_network('19.0.0.0/8')
+    reserved, prefixes = _random_case(7, base, [30, 30, 30, 24, 26, 29], 40, reserved_count=5)
+    got = _one_at_a_time(base, prefixes, UsedRanges(reserved), skip_first_prefix=30)
+    expected = _one_at_a_time(base, prefixes, list(reserved), skip_first_prefix=30,
+                              allocate=_generate_blocks_reference)
+    assert got == expected
+
+
+def test_used_ranges_merges_and_detects_overlap():
+    used = UsedRanges()
+    used.add(ipaddress.ip_network('10.0.0.0/30'))
+    used.add(ipaddress.ip_network('10.0.0.8/30'))
+    used.add(ipaddress.ip_network('10.0.0.4/30'))
+    assert len(used) == 1
+
+    start = int(ipaddress.ip_address('10.0.0.0'))
+    assert used.find_overlap(start + 4, start + 7) == start + 11
+    assert used.find_overlap(start + 12, start + 15) is None
+
+
+def test_generate_blocks_skips_externally_reserved_network():
+    base = ipaddress.ip_network('192.168.0.0/16')
+    used = UsedRanges([ipaddress.ip_network('192.168.1.0/24')])
+    blocks = generate_blocks(base, 24, 2, used, skip_first=True)
+    assert [str(b) for b in blocks] == ['192.168.2.0/24', '192.168.3.0/24']
+
+
+def test_generate_blocks_count_equals_repeated_single_calls():
+    base = ipaddress.ip_network('19.0.0.0/8')
+    reserved = [ipaddress.ip_network('19.0.0.8/29'), ipaddress.ip_network('19.0.0.20/30')]
+    one_by_one = _one_at_a_time(base, [30] * 6, UsedRanges(reserved), skip_first_prefix=30)
+    assert generate_blocks(base, 30, 6, UsedRanges(reserved), skip_first=True) == one_by_one
+
+
+def test_generate_blocks_batch_matches_sequential_calls():
+    base = ipaddress.ip_network('10.0.0.0/16')
+    for seed in range(20):
+        reserved, prefixes = _random_case(seed, base, [24, 26, 27, 29, 30], 12, reserved_count=5)
+        sequential = _one_at_a_time(base, prefixes, UsedRanges(reserved))
+        assert generate_blocks_batch(base, prefixes, UsedRanges(reserved)) == sequential
+
+
+def test_first_last_host_matches_hosts_list():
+    for cidr in ('19.0.0.0/30', '19.0.0.0/29', '10.1.0.0/20', '10.0.0.0/31', '10.0.0.7/32'):
+        net = ipaddress.ip_network(cidr)
+        hosts = list(net.hosts())
+        assert first_last_host(net) == (hosts[0], hosts[-1])